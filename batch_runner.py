@@ -6,15 +6,47 @@ D OS Batch Runner — Anthropic Batch API интеграциясы
 Қолдану:
   python batch_runner.py submit    # Тапсырмаларды жіберу
   python batch_runner.py status    # Статус тексеру
-  python batch_runner.py results   # Нәтижелерді алу
+  python batch_runner.py results   # Нәтижелерді алу [--full: толық мәтінді шығару]
+  python batch_runner.py watch     # Барлығы аяқталғанша күтіп, нәтижелерді алу
+  python batch_runner.py cache     # Кэш статистикасы (ескіргенін тазалайды)
   python batch_runner.py add "тапсырма" [--id custom_id] [--model opus]
+  python batch_runner.py add --from-file prompts.jsonl [--model opus]
+
+prompts.jsonl: әр жолда {"prompt": "...", "custom_id": "...", "model": "..."}
+(custom_id мен model міндетті емес).
+
+Кезек batch_tasks/pending.jsonl-да: add тек соңына жазады (файл құлпымен),
+submit жіберілгенін өшіріп, файлды қысқартады.
+
+Нәтижелер batch_results/<batch_id>.jsonl-ға ағынмен жазылады; жүктеу үзілсе,
+келесі 'results' тоқтаған жерінен жалғастырады.
+
+Кэш (batch_results/cache.sqlite3): сәтті жауаптар model + params хэшімен
+сақталады. submit кезінде кэште бар тапсырма жіберілмей, жауабы
+batch_results/cached-<уақыт>.jsonl-ға жазылады; кезектегі бірдей тапсырмалар
+бір сұраныс болып жіберіліп, нәтижеде әрқайсысына көшіріледі
+("duplicate_of"). BATCH_CACHE=off — кэштен оқымау; BATCH_CACHE_TTL_DAYS,
+BATCH_CACHE_MAX_MB — мерзімі мен көлемі.
+
+Көп тапсырма Batch API шегіне (100 000 сұраныс / 256 MB) сыймаса, бірнеше
+batch-қа бөлініп, қатар жіберіледі (BATCH_MAX_REQUESTS, BATCH_MAX_BYTES,
+BATCH_SUBMIT_CONCURRENCY). Жіберілмей қалған бөліктер pending-те қалады.
 """
 
 import anthropic
+import asyncio
+import fcntl
+import hashlib
 import json
 import os
+import secrets
+import sqlite3
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # .env файлын жүктеу
@@ -29,9 +61,13 @@ if env_file.exists():
 
 # Paths
 WORKSPACE = Path(__file__).parent
-TASKS_FILE = WORKSPACE / "batch_tasks" / "pending.json"
+TASKS_FILE = WORKSPACE / "batch_tasks" / "pending.jsonl"
+LEGACY_TASKS_FILE = WORKSPACE / "batch_tasks" / "pending.json"  # бұрынғы формат
+LOCK_FILE = WORKSPACE / "batch_tasks" / ".pending.lock"
 ACTIVE_FILE = WORKSPACE / "batch_tasks" / "active.json"
+ACTIVE_LOCK_FILE = WORKSPACE / "batch_tasks" / ".active.lock"
 RESULTS_DIR = WORKSPACE / "batch_results"
+CACHE_FILE = RESULTS_DIR / "cache.sqlite3"
 
 # Model mapping
 MODELS = {
@@ -42,9 +78,25 @@ MODELS = {
 
 DEFAULT_MODEL = "sonnet"  # Batch үшін sonnet жеткілікті, opus-тан 10x арзан
 
+# Batch API шектеулері: бір batch-та 100 000 сұраныс, 256 MB
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", 100_000))
+BATCH_MAX_BYTES = int(os.environ.get("BATCH_MAX_BYTES", 200 * 1024 * 1024))  # 256 MB-тан қор қалдырамыз
+BATCH_SUBMIT_CONCURRENCY = int(os.environ.get("BATCH_SUBMIT_CONCURRENCY", 4))
 
-def get_client():
-    """Anthropic client инициализациясы"""
+# Статус/нәтиже: бір уақытта неше batch-қа сұраныс, watch аралығы (секунд)
+BATCH_POLL_CONCURRENCY = int(os.environ.get("BATCH_POLL_CONCURRENCY", 8))
+BATCH_WATCH_MIN_SECONDS = float(os.environ.get("BATCH_WATCH_MIN_SECONDS", 30))
+BATCH_WATCH_MAX_SECONDS = float(os.environ.get("BATCH_WATCH_MAX_SECONDS", 600))
+
+# Жауап кэші
+BATCH_CACHE = os.environ.get("BATCH_CACHE", "on")  # off: кэштен оқымау (жазу жалғасады)
+BATCH_CACHE_TTL_DAYS = float(os.environ.get("BATCH_CACHE_TTL_DAYS", 30))
+BATCH_CACHE_MAX_MB = float(os.environ.get("BATCH_CACHE_MAX_MB", 512))
+
+
+@lru_cache(maxsize=None)
+def get_api_key():
+    """API кілті (процесте бір рет оқылады)"""
     # Алдымен env variable тексеру
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     
@@ -63,22 +115,106 @@ def get_client():
         print("   export ANTHROPIC_API_KEY=sk-ant-...")
         sys.exit(1)
     
-    return anthropic.Anthropic(api_key=api_key)
+    return api_key
+
+
+def get_client():
+    """Anthropic client инициализациясы"""
+    return anthropic.Anthropic(api_key=get_api_key())
+
+
+def get_async_client():
+    """Статус/нәтиже үшін async client (async with ішінде қолданылады)"""
+    return anthropic.AsyncAnthropic(api_key=get_api_key())
+
+
+@contextmanager
+def _file_lock(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@contextmanager
+def queue_lock():
+    """Кезек файлына эксклюзивті құлып (параллель add/submit жазбаларды жоғалтпайды)"""
+    with _file_lock(LOCK_FILE):
+        _migrate_legacy_tasks()
+        yield
+
+
+def _migrate_legacy_tasks():
+    """Ескі pending.json-ды pending.jsonl-ға бір рет көшіру (құлып ішінде шақырылады)"""
+    if not LEGACY_TASKS_FILE.exists():
+        return
+    with open(LEGACY_TASKS_FILE) as f:
+        tasks = json.load(f)
+    _append_lines(tasks)
+    LEGACY_TASKS_FILE.unlink()
+
+
+def _append_lines(tasks):
+    with open(TASKS_FILE, "a+b") as f:
+        # Үзіліп қалған соңғы жол келесі жазбаны бұзбасын
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.writelines((json.dumps(t, ensure_ascii=False) + "\n").encode() for t in tasks)
+
+
+def _parse_lines(data: bytes):
+    tasks = []
+    for number, line in enumerate(data.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            tasks.append(json.loads(line))
+        except json.JSONDecodeError:
+            print(f"⚠️  pending.jsonl:{number} оқылмады, өткізіп жібердік")
+    return tasks
+
+
+def append_tasks(tasks):
+    """Тапсырмаларды кезектің соңына қосу — бар кезекті оқымайды, O(жаңа тапсырмалар)"""
+    with queue_lock():
+        _append_lines(tasks)
+
+
+def read_queue():
+    """Барлық pending тапсырма және оқылған жердің byte offset-і (compact_queue үшін)"""
+    with queue_lock():
+        if not TASKS_FILE.exists():
+            return [], 0
+        data = TASKS_FILE.read_bytes()
+    return _parse_lines(data), len(data)
 
 
 def load_tasks():
     """Pending тапсырмаларды оқу"""
-    if not TASKS_FILE.exists():
-        return []
-    with open(TASKS_FILE) as f:
-        return json.load(f)
+    return read_queue()[0]
+
 
+def compact_queue(keep, offset):
+    """Кезекті қысқарту: read_queue оқыған бөліктен тек ``keep`` қалады.
 
-def save_tasks(tasks):
-    """Тапсырмаларды сақтау"""
-    TASKS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(TASKS_FILE, "w") as f:
-        json.dump(tasks, f, indent=2, ensure_ascii=False)
+    ``offset``-тен кейін басқа add қосқан жолдар сақталады. Жаңа offset
+    қайтарылады (келесі compact_queue үшін).
+    """
+    with queue_lock():
+        data = TASKS_FILE.read_bytes() if TASKS_FILE.exists() else b""
+        head = "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in keep).encode()
+        tmp = TASKS_FILE.with_suffix(".jsonl.tmp")
+        with open(tmp, "wb") as f:
+            f.write(head + data[offset:])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, TASKS_FILE)
+    return len(head)
 
 
 def load_active():
@@ -90,83 +226,329 @@ def load_active():
 
 
 def save_active(active):
-    """Активті batch-тарды сақтау"""
+    """Активті batch-тарды сақтау (құлыпсыз оқитындар жартылай файл көрмейді)"""
     ACTIVE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(ACTIVE_FILE, "w") as f:
+    tmp = ACTIVE_FILE.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
         json.dump(active, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, ACTIVE_FILE)
 
 
-def add_task(prompt: str, custom_id: str = None, model: str = DEFAULT_MODEL):
-    """Жаңа тапсырма қосу"""
-    tasks = load_tasks()
-    
+@contextmanager
+def edit_active():
+    """active.json-ды құлыппен қайта оқып өзгерту.
+
+    Ұзақ жүретін results/watch ескі көшірмені сақтамауы керек: әйтпесе
+    сол уақытта submit қосқан batch жоғалады. Сондықтан әр өзгеріс файлдың
+    қазіргі күйіне тек өз жазбасын енгізеді.
+    """
+    with _file_lock(ACTIVE_LOCK_FILE):
+        active = load_active()
+        yield active
+        save_active(active)
+
+
+def make_task(prompt: str, custom_id: str = None, model: str = DEFAULT_MODEL):
+    """Кезекке жазылатын тапсырма"""
     if custom_id is None:
-        custom_id = f"task-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{len(tasks)}"
+        custom_id = f"task-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
     
-    model_id = MODELS.get(model, model)
-    
-    task = {
+    return {
         "custom_id": custom_id,
         "params": {
-            "model": model_id,
+            "model": MODELS.get(model, model),
             "max_tokens": 4096,
             "messages": [{"role": "user", "content": prompt}]
         },
         "added_at": datetime.now().isoformat()
     }
-    
-    tasks.append(task)
-    save_tasks(tasks)
-    print(f"✅ Тапсырма қосылды: {custom_id}")
-    print(f"   Model: {model_id}")
-    print(f"   Pending: {len(tasks)} тапсырма")
+
+
+def add_task(prompt: str, custom_id: str = None, model: str = DEFAULT_MODEL):
+    """Жаңа тапсырма қосу"""
+    task = make_task(prompt, custom_id, model)
+    append_tasks([task])
+    print(f"✅ Тапсырма қосылды: {task['custom_id']}")
+    print(f"   Model: {task['params']['model']}")
+
+
+def add_from_file(path: str, model: str = DEFAULT_MODEL, chunk_size: int = 1000):
+    """JSONL файлдан көп тапсырманы бір өтуде қосу"""
+    added = 0
+    chunk = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                chunk.append(make_task(item["prompt"], item.get("custom_id"), item.get("model", model)))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print(f"⚠️  {path}:{number} — 'prompt' өрісі бар JSON объекті емес, өткізіп жібердік")
+                continue
+            if len(chunk) >= chunk_size:
+                append_tasks(chunk)
+                added += len(chunk)
+                chunk = []
+    if chunk:
+        append_tasks(chunk)
+        added += len(chunk)
+    print(f"✅ {added} тапсырма қосылды ({path})")
+
+
+def cache_key(params):
+    """Сұраныстың мазмұн хэші (model + барлық params)"""
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_cache():
+    """Кэш базасы: responses — жауаптар, inflight — жіберілген сұраныстардың кілті мен көшірмелері"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(CACHE_FILE, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+        CREATE TABLE IF NOT EXISTS inflight (
+            batch_id TEXT NOT NULL,
+            custom_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            duplicates TEXT,
+            PRIMARY KEY (batch_id, custom_id)
+        );
+    """)
+    return db
+
+
+def cache_lookup(keys):
+    """Мерзімі өтпеген жауаптар: key -> мәтін"""
+    db = get_cache()
+    now = time.time()
+    cutoff = now - BATCH_CACHE_TTL_DAYS * 86400
+    found = {}
+    for start in range(0, len(keys), 500):
+        part = keys[start:start + 500]
+        placeholders = ",".join("?" * len(part))
+        found.update(db.execute(
+            f"SELECT key, content FROM responses WHERE created_at > ? AND key IN ({placeholders})",
+            [cutoff, *part],
+        ))
+    db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?", [(now, key) for key in found])
+    db.commit()
+    return found
+
+
+def cache_evict():
+    """Ескіргенін өшіру, көлем шегінен асса — ең ұзақ қолданылмағанынан бастап"""
+    db = get_cache()
+    db.execute("DELETE FROM responses WHERE created_at <= ?", [time.time() - BATCH_CACHE_TTL_DAYS * 86400])
+    excess = (db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+              - BATCH_CACHE_MAX_MB * 1024 * 1024)
+    if excess > 0:
+        evicted = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+    db.commit()
+
+
+def write_cached_results(submission, hits):
+    """Кэштен алынған жауаптарды нәтиже файлына жазу; hits: [(тапсырма, мәтін)]"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    result_file = RESULTS_DIR / f"cached-{submission}.jsonl"
+    with open(result_file, "a", encoding="utf-8") as f:
+        for task, content in hits:
+            record = {"custom_id": task["custom_id"], "type": "succeeded", "content": content,
+                      "error": None, "cached": True}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return result_file
+
+
+def remember_inflight(batch_id, chunk, groups):
+    """Жіберілген сұраныстың кэш кілті мен көшірмелері (нәтиже келгенде керек)"""
+    rows = []
+    for task in chunk:
+        key = cache_key(task["params"])
+        duplicates = [t["custom_id"] for t in groups[key][1:]]
+        rows.append((batch_id, task["custom_id"], key, json.dumps(duplicates) if duplicates else None))
+    db = get_cache()
+    db.executemany("INSERT OR REPLACE INTO inflight VALUES (?, ?, ?, ?)", rows)
+    db.commit()
+
+
+def show_cache():
+    """Кэш статистикасы"""
+    cache_evict()
+    db = get_cache()
+    entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+    inflight = db.execute("SELECT COUNT(*) FROM inflight").fetchone()[0]
+    print(f"🗄️  Кэш: {entries} жауап, {size / 1024 / 1024:.1f}/{BATCH_CACHE_MAX_MB:.0f} MB")
+    print(f"   Мерзімі: {BATCH_CACHE_TTL_DAYS:.0f} күн, кэштен оқу: {BATCH_CACHE}")
+    print(f"   Нәтижесі күтілетін сұраныстар: {inflight}")
+
+
+def batch_request(task):
+    """Batch API сұранысы (тек custom_id және params)"""
+    return {"custom_id": task["custom_id"], "params": task["params"]}
+
+
+def iter_chunks(tasks):
+    """Тапсырмаларды саны мен көлемі шектелген бөліктерге бөлу"""
+    chunk, chunk_bytes = [], 0
+    for task in tasks:
+        size = len(json.dumps(batch_request(task), ensure_ascii=False).encode())
+        if chunk and (len(chunk) >= BATCH_MAX_REQUESTS or chunk_bytes + size > BATCH_MAX_BYTES):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(task)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
 
 
 def submit_batch():
-    """Batch API-ға жіберу"""
-    tasks = load_tasks()
+    """Batch API-ға жіберу (үлкен кезек бірнеше batch-қа бөлінеді)"""
+    tasks, offset = read_queue()
     
     if not tasks:
         print("📭 Жіберетін тапсырма жоқ")
         return
     
-    client = get_client()
+    submission = datetime.now().strftime("%Y%m%d-%H%M%S")
     
-    # Batch request дайындау
-    requests = []
+    # Бірдей сұраныстар бір топқа: кілт -> тапсырмалар (біріншісі жіберіледі)
+    groups = {}
     for task in tasks:
-        requests.append({
-            "custom_id": task["custom_id"],
-            "params": task["params"]
-        })
+        groups.setdefault(cache_key(task["params"]), []).append(task)
     
-    print(f"📤 {len(requests)} тапсырма жіберілуде...")
+    # Кэште жауабы барлар жергілікті орындалады
+    cached = cache_lookup(list(groups)) if BATCH_CACHE != "off" else {}
+    if cached:
+        hits = [(task, content) for key, content in cached.items() for task in groups.pop(key)]
+        result_file = write_cached_results(submission, hits)
+        offset = compact_queue([t for group in groups.values() for t in group], offset)
+        print(f"♻️  {len(hits)} тапсырма кэштен алынды → {result_file.name}")
     
-    try:
-        batch = client.messages.batches.create(requests=requests)
-        
-        # Активке қосу
-        active = load_active()
-        active[batch.id] = {
-            "id": batch.id,
-            "status": batch.processing_status,
-            "created_at": datetime.now().isoformat(),
-            "task_count": len(requests),
-            "task_ids": [t["custom_id"] for t in tasks]
-        }
-        save_active(active)
-        
-        # Pending тазалау
-        save_tasks([])
+    if not groups:
+        print("✅ Жіберетін жаңа сұраныс жоқ")
+        return
+    
+    requests = [group[0] for group in groups.values()]
+    duplicates = sum(len(group) for group in groups.values()) - len(requests)
+    if duplicates:
+        print(f"🔁 {duplicates} қайталанған тапсырма біріктірілді")
+    
+    client = get_client()
+    
+    # Бөлік нөмірі -> сұраныстар; сәтті жіберілгені бірден өшіріледі
+    unsent = dict(enumerate(iter_chunks(requests), 1))
+    total_chunks = len(unsent)
+    
+    print(f"📤 {len(requests)} сұраныс {total_chunks} batch-пен жіберілуде...")
+    
+    def submit_chunk(chunk):
+        # Сұраныстар тізімі тек осы бөлік үшін құрылады
+        return client.messages.batches.create(requests=[batch_request(t) for t in chunk])
+    
+    failed = 0
+    
+    with ThreadPoolExecutor(max_workers=BATCH_SUBMIT_CONCURRENCY) as pool:
+        futures = {pool.submit(submit_chunk, chunk): number for number, chunk in unsent.items()}
+        for future in as_completed(futures):
+            number = futures[future]
+            chunk = unsent[number]
+            try:
+                batch = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ Бөлік {number}/{total_chunks} ({len(chunk)} тапсырма): {e}")
+                continue
+            
+            remember_inflight(batch.id, chunk, groups)
+            task_ids = [t["custom_id"] for task in chunk for t in groups[cache_key(task["params"])]]
+            
+            # Әр бөлік — active.json-дағы жеке batch; процесс үзілсе де,
+            # жіберілген тапсырма қайта жіберілмейді
+            with edit_active() as active:
+                active[batch.id] = {
+                    "id": batch.id,
+                    "status": batch.processing_status,
+                    "created_at": datetime.now().isoformat(),
+                    "submission": submission,
+                    "chunk": f"{number}/{total_chunks}",
+                    "request_count": len(chunk),
+                    "task_count": len(task_ids),
+                    "task_ids": task_ids
+                }
+            del unsent[number]
+            offset = compact_queue([
+                t for number in sorted(unsent) for task in unsent[number] for t in groups[cache_key(task["params"])]
+            ], offset)
+            
+            print(f"✅ Бөлік {number}/{total_chunks}: {batch.id} ({len(chunk)} тапсырма)")
+    
+    print(f"\n📦 Жіберілді: {total_chunks - failed}/{total_chunks} batch")
+    
+    if failed:
+        remaining = sum(len(groups[cache_key(t["params"])]) for chunk in unsent.values() for t in chunk)
+        print(f"⚠️  {remaining} тапсырма pending-те қалды — 'python batch_runner.py submit' арқылы қайта жіберіңіз")
+        sys.exit(1)
+
+
+async def retrieve_batches(client, batch_ids):
+    """Барлық batch-ты қатар сұрау (BATCH_POLL_CONCURRENCY шегімен); id -> batch не қате"""
+    semaphore = asyncio.Semaphore(BATCH_POLL_CONCURRENCY)
+    
+    async def retrieve(batch_id):
+        async with semaphore:
+            try:
+                return await client.messages.batches.retrieve(batch_id)
+            except Exception as e:
+                return e
+    
+    batches = await asyncio.gather(*(retrieve(batch_id) for batch_id in batch_ids))
+    return dict(zip(batch_ids, batches))
+
+
+async def status_sweep(client, active):
+    """Статустарды жаңартып шығару; id -> batch (сәтсіз сұраныстар жоқ)"""
+    batches = await retrieve_batches(client, list(active))
+    
+    for batch_id, batch in batches.items():
+        info = active[batch_id]
+        if isinstance(batch, Exception):
+            print(f"❌ {batch_id}: {batch}")
+            continue
         
-        print(f"✅ Batch жіберілді!")
-        print(f"   ID: {batch.id}")
+        print(f"\n📦 Batch: {batch_id}")
         print(f"   Status: {batch.processing_status}")
-        print(f"   Tasks: {len(requests)}")
+        print(f"   Tasks: {info['task_count']}")
+        if "chunk" in info:
+            print(f"   Бөлік: {info['chunk']} ({info['submission']})")
         
-    except Exception as e:
-        print(f"❌ Қате: {e}")
-        sys.exit(1)
+        if hasattr(batch, 'request_counts'):
+            rc = batch.request_counts
+            print(f"   Progress: {rc.succeeded + rc.errored}/{rc.processing + rc.succeeded + rc.errored}")
+        
+        # Статусты жаңарту
+        info["status"] = batch.processing_status
+    
+    with edit_active() as current:
+        for batch_id, info in active.items():
+            if batch_id in current:
+                current[batch_id]["status"] = info["status"]
+    return {batch_id: batch for batch_id, batch in batches.items() if not isinstance(batch, Exception)}
 
 
 def check_status():
@@ -177,90 +559,190 @@ def check_status():
         print("📭 Активті batch жоқ")
         return
     
-    client = get_client()
+    async def run():
+        async with get_async_client() as client:
+            batches = await status_sweep(client, active)
+        if any(batch.processing_status == "ended" for batch in batches.values()):
+            print(f"\n✅ Аяқталғандары бар! 'python batch_runner.py results' деп нәтижені алыңыз")
     
-    for batch_id, info in list(active.items()):
-        try:
-            batch = client.messages.batches.retrieve(batch_id)
-            
-            print(f"\n📦 Batch: {batch_id}")
-            print(f"   Status: {batch.processing_status}")
-            print(f"   Tasks: {info['task_count']}")
-            
-            if hasattr(batch, 'request_counts'):
-                rc = batch.request_counts
-                print(f"   Progress: {rc.succeeded + rc.errored}/{rc.processing + rc.succeeded + rc.errored}")
-            
-            # Статусты жаңарту
-            active[batch_id]["status"] = batch.processing_status
+    asyncio.run(run())
+
+
+def result_record(result):
+    """Batch нәтижесінің JSONL жолы"""
+    record = {"custom_id": result.custom_id, "type": result.result.type, "content": None, "error": None}
+    if result.result.type == "succeeded":
+        record["content"] = "".join(
+            block.text for block in result.result.message.content if block.type == "text"
+        )
+    elif result.result.type == "errored":
+        record["error"] = str(result.result.error)
+    return record
+
+
+async def download_results(client, batch_id, show_full=False):
+    """Нәтижелерді JSONL-ға ағынмен жазу, жадта тек бір нәтиже тұрады.
+
+    Жүктеу <batch_id>.jsonl.part файлына жүреді; үзілсе, келесі жолы файлдағы
+    толық жолдар саны (курсор) өткізіліп, қалғаны жалғасады. Соңында файл
+    <batch_id>.jsonl болып қайта аталады.
+    """
+    final_file = RESULTS_DIR / f"{batch_id}.jsonl"
+    part_file = RESULTS_DIR / f"{batch_id}.jsonl.part"
+    
+    # Курсор: бұрын толық жазылған нәтижелер. Әр нәтиженің көшірмелері
+    # алдымен, өз жолы соңында жазылады; файл соңғы толық топқа дейін
+    # кесіледі, үзілген топ көшірмелерімен бірге қайта жазылады
+    cursor = 0
+    if part_file.exists():
+        with open(part_file, "r+b") as f:
+            data = f.read()
+            position = complete = 0
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                position += len(line)
+                if "duplicate_of" not in json.loads(line):
+                    cursor += 1
+                    complete = position
+            f.truncate(complete)
+        print(f"   ↪️  Жалғастырамыз: {cursor} нәтиже бұрын жүктелген")
+    
+    cache = get_cache()
+    counts = {}
+    errored = []
+    # Үзілсе де, жазылған жауаптар кэште қалады
+    try:
+        with open(part_file, "a", encoding="utf-8") as f:
+            index = -1
+            async for result in await client.messages.batches.results(batch_id):
+                index += 1
+                kind = result.result.type
+                counts[kind] = counts.get(kind, 0) + 1
+                if kind != "succeeded" and len(errored) < 5:
+                    errored.append(result.custom_id)
+                if index < cursor:
+                    continue
             
-            if batch.processing_status == "ended":
-                print(f"   ✅ Аяқталды! 'python batch_runner.py results' деп нәтижені алыңыз")
-                
-        except Exception as e:
-            print(f"❌ {batch_id}: {e}")
+                record = result_record(result)
+                records = [record]
+                inflight = cache.execute(
+                    "SELECT key, duplicates FROM inflight WHERE batch_id = ? AND custom_id = ?",
+                    (batch_id, record["custom_id"]),
+                ).fetchone()
+                if inflight:
+                    key, duplicates = inflight
+                    if record["type"] == "succeeded":
+                        now = time.time()
+                        cache.execute(
+                            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                            (key, record["content"], len(record["content"].encode()), now, now),
+                        )
+                    # Біріктірілген тапсырмаларға көшірме; негізгі жол соңында,
+                    # үзілсе бүкіл топ қайта жазылады
+                    records = [
+                        {**record, "custom_id": duplicate, "duplicate_of": record["custom_id"]}
+                        for duplicate in json.loads(duplicates or "[]")
+                    ] + records
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+                if show_full:
+                    status = "✅" if record["type"] == "succeeded" else "❌"
+                    print(f"\n   {status} {record['custom_id']}:")
+                    print(f"      {record['content'] or record['error']}")
+    finally:
+        cache.commit()
     
-    save_active(active)
+    os.replace(part_file, final_file)
+    cache.execute("DELETE FROM inflight WHERE batch_id = ?", (batch_id,))
+    cache.commit()
+    cache_evict()
+    return final_file, counts, errored
 
 
-def get_results():
+async def fetch_ended(client, active, batches, show_full=False):
+    """Аяқталған batch-тардың нәтижесін қатар жүктеу; жүктелгені active-тен өшіріледі"""
+    # --full кезінде мәтіндер араласпасын деп бір-бірден
+    semaphore = asyncio.Semaphore(1 if show_full else BATCH_POLL_CONCURRENCY)
+    
+    async def fetch(batch_id):
+        async with semaphore:
+            try:
+                result_file, counts, errored = await download_results(client, batch_id, show_full)
+            except Exception as e:
+                print(f"❌ {batch_id}: {e}")
+                return
+        
+        # Қысқаша summary
+        total = sum(counts.values())
+        size_mb = result_file.stat().st_size / 1024 / 1024
+        print(f"\n📥 {batch_id}: {result_file.name} ({total} нәтиже, {size_mb:.1f} MB)")
+        print("   " + "  ".join(f"{kind}: {n}" for kind, n in sorted(counts.items())))
+        if errored:
+            print(f"   ❌ Сәтсіз (алғашқылары): {', '.join(errored)}")
+        
+        # Активтен өшіру
+        del active[batch_id]
+        with edit_active() as current:
+            current.pop(batch_id, None)
+    
+    ended = [batch_id for batch_id, batch in batches.items() if batch.processing_status == "ended"]
+    await asyncio.gather(*(fetch(batch_id) for batch_id in ended))
+    return len(ended)
+
+
+def get_results(show_full=False):
     """Аяқталған batch нәтижелерін алу"""
     active = load_active()
-    client = get_client()
+    
+    if not active:
+        print("📭 Активті batch жоқ")
+        return
     
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
     
-    for batch_id, info in list(active.items()):
-        try:
-            batch = client.messages.batches.retrieve(batch_id)
-            
-            if batch.processing_status != "ended":
-                print(f"⏳ {batch_id}: әлі өңделуде ({batch.processing_status})")
-                continue
-            
-            print(f"\n📥 Нәтижелер алынуда: {batch_id}")
-            
-            # Нәтижелерді алу
-            results = []
-            for result in client.messages.batches.results(batch_id):
-                results.append({
-                    "custom_id": result.custom_id,
-                    "type": result.result.type,
-                    "content": result.result.message.content[0].text if result.result.type == "succeeded" else None,
-                    "error": str(result.result.error) if result.result.type == "errored" else None
-                })
-            
-            # Файлға сақтау
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            result_file = RESULTS_DIR / f"{timestamp}_{batch_id[:8]}.json"
-            
-            with open(result_file, "w") as f:
-                json.dump({
-                    "batch_id": batch_id,
-                    "completed_at": datetime.now().isoformat(),
-                    "results": results
-                }, f, indent=2, ensure_ascii=False)
-            
-            print(f"   ✅ Сақталды: {result_file.name}")
-            print(f"   Нәтижелер: {len(results)}")
-            
-            # Summary көрсету
-            for r in results:
-                status = "✅" if r["type"] == "succeeded" else "❌"
-                preview = r["content"][:100] + "..." if r["content"] and len(r["content"]) > 100 else r["content"]
-                print(f"\n   {status} {r['custom_id']}:")
-                if r["content"]:
-                    print(f"      {preview}")
-                if r["error"]:
-                    print(f"      Error: {r['error']}")
-            
-            # Активтен өшіру
-            del active[batch_id]
-            
-        except Exception as e:
-            print(f"❌ {batch_id}: {e}")
+    async def run():
+        async with get_async_client() as client:
+            batches = await retrieve_batches(client, list(active))
+            for batch_id, batch in batches.items():
+                if isinstance(batch, Exception):
+                    print(f"❌ {batch_id}: {batch}")
+                elif batch.processing_status != "ended":
+                    print(f"⏳ {batch_id}: әлі өңделуде ({batch.processing_status})")
+            batches = {b: batch for b, batch in batches.items() if not isinstance(batch, Exception)}
+            await fetch_ended(client, active, batches, show_full)
+        if not show_full:
+            print("\nТолық мәтін: batch_results/ файлдарында немесе 'results --full'")
     
-    save_active(active)
+    asyncio.run(run())
+
+
+def watch(show_full=False):
+    """Барлығы аяқталғанша статус тексеріп, нәтижелерді жүктеу (exponential backoff)"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    
+    async def run():
+        delay = BATCH_WATCH_MIN_SECONDS
+        async with get_async_client() as client:
+            while True:
+                active = load_active()
+                if not active:
+                    print("\n🎉 Барлық batch аяқталды")
+                    return
+                
+                batches = await status_sweep(client, active)
+                fetched = await fetch_ended(client, active, batches, show_full)
+                if not active:
+                    continue
+                
+                # Бірдеңе аяқталса — жиірек, әйтпесе аралықты екі есе ұзартамыз
+                delay = BATCH_WATCH_MIN_SECONDS if fetched else min(delay * 2, BATCH_WATCH_MAX_SECONDS)
+                print(f"\n⏳ {len(active)} batch өңделуде, {delay:.0f} с кейін қайта тексереміз...")
+                await asyncio.sleep(delay)
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n👋 Тоқтатылды")
 
 
 def list_pending():
@@ -290,14 +772,16 @@ def main():
         if len(sys.argv) < 3:
             print("❌ Тапсырма мәтінін енгізіңіз")
             print("   python batch_runner.py add 'тапсырма мәтіні'")
+            print("   python batch_runner.py add --from-file prompts.jsonl")
             return
         
         prompt = sys.argv[2]
         custom_id = None
+        from_file = None
         model = DEFAULT_MODEL
         
         # Parse optional args
-        i = 3
+        i = 2
         while i < len(sys.argv):
             if sys.argv[i] == "--id" and i + 1 < len(sys.argv):
                 custom_id = sys.argv[i + 1]
@@ -305,10 +789,16 @@ def main():
             elif sys.argv[i] == "--model" and i + 1 < len(sys.argv):
                 model = sys.argv[i + 1]
                 i += 2
+            elif sys.argv[i] == "--from-file" and i + 1 < len(sys.argv):
+                from_file = sys.argv[i + 1]
+                i += 2
             else:
                 i += 1
         
-        add_task(prompt, custom_id, model)
+        if from_file:
+            add_from_file(from_file, model)
+        else:
+            add_task(prompt, custom_id, model)
         
     elif cmd == "list":
         list_pending()
@@ -320,7 +810,13 @@ def main():
         check_status()
         
     elif cmd == "results":
-        get_results()
+        get_results(show_full="--full" in sys.argv[2:])
+        
+    elif cmd == "watch":
+        watch(show_full="--full" in sys.argv[2:])
+        
+    elif cmd == "cache":
+        show_cache()
         
     else:
         print(f"❌ Белгісіз команда: {cmd}")
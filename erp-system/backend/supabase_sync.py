@@ -2,6 +2,7 @@ import os
 import json
 import asyncio
 import datetime
+from collections import OrderedDict
 from supabase import create_async_client, AsyncClient
 
 # Load environment variables
@@ -26,23 +27,43 @@ async def report_to_chat(supabase: AsyncClient, sender: str, text: str):
         await supabase.table("internal_chat").insert({"sender": sender, "text": text}).execute()
     except: pass
 
+# Lead ids recently taken by this process: the scan and Realtime can both
+# deliver a lead. Once handled its status is no longer "new", so only the
+# latest ids matter; the oldest are forgotten past HANDLED_LEADS_MAX.
+HANDLED_LEADS_MAX = 10000
+handled_leads = OrderedDict()
+# asyncio keeps only weak references to tasks; hold them until they finish
+lead_tasks = set()
+
 async def process_lead(supabase: AsyncClient, lead):
+    if lead.get("id") in handled_leads:
+        return
+    handled_leads[lead.get("id")] = True
+    if len(handled_leads) > HANDLED_LEADS_MAX:
+        handled_leads.popitem(last=False)
     print(f"🔥 ACTION: New Lead for {lead.get('business_name')}")
     
-    # 1. Log Operation
-    await supabase.table("operations").insert({
-        "user": "WebsiteBuilder",
-        "action": "LEAD_PROCESSING_START",
-        "details": f"Auto-processing lead: {lead.get('business_name')}"
-    }).execute()
+    try:
+        # 1. Log Operation
+        await supabase.table("operations").insert({
+            "user": "WebsiteBuilder",
+            "action": "LEAD_PROCESSING_START",
+            "details": f"Auto-processing lead: {lead.get('business_name')}"
+        }).execute()
 
-    # 2. Update Lead Status
-    await supabase.table("leads").update({"status": "in_progress"}).eq("id", lead.get("id")).execute()
+        # 2. Update Lead Status
+        await supabase.table("leads").update({"status": "in_progress"}).eq("id", lead.get("id")).execute()
+    except Exception:
+        # Still "new": let the next scan pick it up again
+        handled_leads.pop(lead.get("id"), None)
+        raise
 
     # 3. Report to Internal Chat
     await report_to_chat(supabase, "WebsiteBuilder", f"Found a new lead for '{lead.get('business_name')}'. Starting brief analysis and iOS 26 draft generation. ETA: 2 hours.")
 
 async def check_new_leads(supabase: AsyncClient):
+    # Catch-up for leads Realtime did not push: ones that arrived while this
+    # process was down or the socket was disconnected (Realtime is at-most-once)
     try:
         response = await supabase.table("leads").select("*").eq("status", "new").execute()
         leads = response.data
@@ -52,6 +73,21 @@ async def check_new_leads(supabase: AsyncClient):
     except Exception as e:
         print(f"Scan Error: {e}")
 
+async def watch_new_leads(supabase: AsyncClient):
+    # The landing backend's outbox replicates each lead here within a second;
+    # Realtime pushes the INSERT; check_new_leads only re-scans every ~10 minutes.
+    # Needs: alter publication supabase_realtime add table leads;
+    def on_insert(payload):
+        lead = payload["data"]["record"]
+        if lead.get("status", "new") == "new":
+            task = asyncio.create_task(process_lead(supabase, lead))
+            lead_tasks.add(task)
+            task.add_done_callback(lead_tasks.discard)
+
+    channel = supabase.channel("new-leads")
+    channel.on_postgres_changes("INSERT", schema="public", table="leads", callback=on_insert)
+    await channel.subscribe()
+
 async def agent_status_pulse(supabase: AsyncClient):
     # Every 30 minutes, agents check in to the War Room
     agents = ["LeadScout", "WebsiteBuilder", "EconomicHunter"]
@@ -71,16 +107,26 @@ async def main():
     # Send initial boot message
     await report_to_chat(supabase, "Core", "🚀 EMPIRE OS v9.0 Boot Sequence Complete. All systems online.")
     
+    # Subscribe before scanning, so a lead inserted in between is pushed
+    await watch_new_leads(supabase)
+    print("👀 Watching for new leads (Realtime).")
+    await check_new_leads(supabase)
+
     pulse_counter = 0
+    rescan_counter = 0
     while True:
-        await check_new_leads(supabase)
-        
         # Every 30 loops (approx 30 mins)
         if pulse_counter >= 30:
             await agent_status_pulse(supabase)
             pulse_counter = 0
+
+        # Safety re-scan every 10 loops (approx 10 mins) for pushes that were missed
+        if rescan_counter >= 10:
+            await check_new_leads(supabase)
+            rescan_counter = 0
             
         pulse_counter += 1
+        rescan_counter += 1
         await asyncio.sleep(60)
 
 if __name__ == "__main__":
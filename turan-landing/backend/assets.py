@@ -0,0 +1,93 @@
+"""Precompressed, cache-friendly delivery of the admin dashboard.
+
+Each asset is encoded once at startup (identity, gzip, and brotli when the
+optional ``brotli`` package is installed) and then served from memory with a
+strong ETag per encoding. Conditional GETs with a matching If-None-Match get
+an empty 304.
+"""
+
+import gzip
+import hashlib
+from pathlib import Path
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Content-hashed URLs never change meaning, so browsers can keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Fixed URLs are always revalidated; the ETag makes that a cheap 304
+REVALIDATE = "no-cache"
+
+# Preference order when the client accepts several
+ENCODINGS = ("br", "gzip", "identity")
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings allowed by an Accept-Encoding header (q=0 excluded)."""
+    accepted = {"identity"}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    accepted.discard(coding)
+                    continue
+            except ValueError:
+                continue
+        if coding == "*":
+            accepted.update(ENCODINGS)
+        else:
+            accepted.add(coding)
+    return accepted
+
+
+class StaticAsset:
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+        self.etags = {encoding: self._etag(encoding) for encoding in self.bodies}
+
+    def _etag(self, encoding: str) -> str:
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def response(self, request: Request) -> Response:
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ENCODINGS if e in self.bodies and e in accepted), "identity")
+
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if self._not_modified(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.bodies[encoding], media_type=self.media_type, headers=headers)
+
+    def _not_modified(self, if_none_match) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison (RFC 9110): proxies may add W/ when they re-encode
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return not tags.isdisjoint(self.etags.values())
@@ -0,0 +1,194 @@
+/*
+ * Rendering cost of the admin leads table, without a browser.
+ *
+ * Loads static/admin-table.js under node with a small stub DOM that counts
+ * the work a browser would have to do: elements created, rows attached, and
+ * characters of HTML handed to innerHTML (which the browser must parse).
+ * Compares the old approach, one innerHTML string for every lead, with the
+ * virtualized LeadTable for a full load, a scroll through the whole list, a
+ * refresh with unchanged data and live inserts/deletes.
+ *
+ * The absolute times are node's, not a browser's; the DOM counters are what
+ * to compare.
+ *
+ * Usage (from turan-landing/backend):
+ *   node benchmarks/bench_admin_table.js --rows 50000
+ */
+
+'use strict';
+
+const path = require('path');
+const { LeadTable, leadCells } = require(path.join(__dirname, '..', 'static', 'admin-table.js'));
+
+function option(name, fallback) {
+    const index = process.argv.indexOf(`--${name}`);
+    return index === -1 ? fallback : Number(process.argv[index + 1]);
+}
+
+const ROWS = option('rows', 50000);
+const VIEWPORT = option('viewport', 700);  // px, roughly 70vh on a laptop
+
+// Stub DOM
+
+const stats = { created: 0, attached: 0, htmlChars: 0 };
+
+function resetStats() {
+    stats.created = 0;
+    stats.attached = 0;
+    stats.htmlChars = 0;
+}
+
+class StubElement {
+    constructor(tag) {
+        this.tagName = tag.toUpperCase();
+        this.children = [];
+        this.parentNode = null;
+        this.style = {};
+        this.dataset = {};
+        this.className = '';
+        this._html = '';
+        this.listeners = {};
+        stats.created++;
+    }
+
+    set innerHTML(html) {
+        this._html = html;
+        this.children = [];
+        stats.htmlChars += html.length;
+    }
+
+    get innerHTML() {
+        return this._html;
+    }
+
+    set textContent(text) {
+        for (const child of this.children) child.parentNode = null;
+        this.children = [];
+    }
+
+    get firstChild() {
+        return this.children[0] || null;
+    }
+
+    get nextSibling() {
+        if (!this.parentNode) return null;
+        const siblings = this.parentNode.children;
+        return siblings[siblings.indexOf(this) + 1] || null;
+    }
+
+    appendChild(child) {
+        return this.insertBefore(child, null);
+    }
+
+    insertBefore(child, reference) {
+        if (child.parentNode) child.remove();
+        const index = reference ? this.children.indexOf(reference) : this.children.length;
+        this.children.splice(index, 0, child);
+        child.parentNode = this;
+        stats.attached++;
+        return child;
+    }
+
+    remove() {
+        if (!this.parentNode) return;
+        const siblings = this.parentNode.children;
+        siblings.splice(siblings.indexOf(this), 1);
+        this.parentNode = null;
+    }
+
+    addEventListener(type, listener) {
+        this.listeners[type] = listener;
+    }
+}
+
+const stubDocument = { createElement: (tag) => new StubElement(tag) };
+
+// Fixture
+
+const THEMES = ['ios26', 'cyber', 'sunset', 'forest', 'chrome'];
+const BUDGETS = ['50,000 - 100,000 ₸', '100,000 - 200,000 ₸', '200,000 - 500,000 ₸', '500,000+ ₸'];
+
+function syntheticLeads(count, firstId) {
+    const leads = [];
+    const start = Date.UTC(2026, 0, 1);
+    for (let i = 0; i < count; i++) {
+        const id = firstId - i;
+        leads.push({
+            id,
+            name: `Lead ${id}`,
+            business_name: `Business ${id}`,
+            business_type: i % 3 ? 'cafe' : 'retail',
+            email: `lead${id}@example.kz`,
+            phone: `+7 700 ${String(id).padStart(7, '0')}`,
+            selected_theme: THEMES[i % THEMES.length],
+            budget_range: BUDGETS[i % BUDGETS.length],
+            created_at: new Date(start + id * 60000).toISOString(),
+        });
+    }
+    return leads;
+}
+
+function rowsInDom(tbody) {
+    return tbody.children.filter((row) => row.dataset.id !== undefined).length;
+}
+
+function measure(label, fn) {
+    resetStats();
+    const started = process.hrtime.bigint();
+    const result = fn();
+    const ms = Number(process.hrtime.bigint() - started) / 1e6;
+    console.log(
+        `${label.padEnd(34)} ${ms.toFixed(1).padStart(9)} ms` +
+        `  created ${String(stats.created).padStart(6)}` +
+        `  attached ${String(stats.attached).padStart(6)}` +
+        `  html ${(stats.htmlChars / 1024).toFixed(0).padStart(7)} KiB`
+    );
+    return result;
+}
+
+function main() {
+    const leads = syntheticLeads(ROWS, ROWS);
+    console.log(`${ROWS} synthetic leads, ${VIEWPORT}px viewport\n`);
+
+    // Before: the whole list as one innerHTML string
+    measure('innerHTML, all rows', () => {
+        const tbody = stubDocument.createElement('tbody');
+        tbody.innerHTML = leads.map((lead) => `<tr>${leadCells(lead)}</tr>`).join('');
+    });
+
+    // After: LeadTable with the whole list loaded
+    const tbody = stubDocument.createElement('tbody');
+    const scroller = stubDocument.createElement('div');
+    scroller.scrollTop = 0;
+    scroller.clientHeight = VIEWPORT;
+    const table = new LeadTable({ tbody, scroller, document: stubDocument, schedule: (callback) => callback() });
+
+    measure('LeadTable.reset, all rows', () => table.reset(leads));
+    console.log(`  rows in DOM: ${rowsInDom(tbody)} of ${table.size}`);
+
+    const steps = Math.ceil((table.size * table.rowHeight) / VIEWPORT);
+    let maxRows = 0;
+    measure(`scroll to bottom (${steps} frames)`, () => {
+        for (let step = 0; step <= steps; step++) {
+            scroller.scrollTop = step * VIEWPORT;
+            table.render();
+            maxRows = Math.max(maxRows, rowsInDom(tbody));
+        }
+    });
+    console.log(`  max rows in DOM while scrolling: ${maxRows}`);
+
+    scroller.scrollTop = 0;
+    table.render();
+    measure('refresh, unchanged data', () => table.reset(leads.map((lead) => ({ ...lead }))));
+
+    const fresh = syntheticLeads(100, ROWS + 100);
+    measure('live: 100 new leads', () => {
+        for (const lead of fresh.reverse()) table.prepend(lead);
+    });
+    measure('live: 100 deletes', () => {
+        for (const lead of fresh) table.remove(lead.id);
+    });
+    console.log(`  rows in DOM: ${rowsInDom(tbody)} of ${table.size}`);
+}
+
+main();
@@ -0,0 +1,70 @@
+"""Throughput of POST /api/leads/bulk.
+
+Posts --rows synthetic leads as one NDJSON body (in-process, httpx +
+ASGITransport), with a share of repeated email+phone pairs, and reports
+rows/sec and the created/duplicate split.
+
+Usage (from turan-landing/backend, needs httpx):
+  python benchmarks/bench_bulk_import.py --rows 100000 --duplicates 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+WORKDIR = tempfile.mkdtemp(prefix="turan-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR}/bulk.db"
+os.environ["LEAD_RATE_LIMIT"] = "off"
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+
+
+def ndjson_body(rows: int, duplicates: float) -> bytes:
+    unique = max(1, int(rows * (1 - duplicates)))
+    lines = (
+        json.dumps({
+            "name": f"Partner lead {i}",
+            "businessName": "Partner Cafe",
+            "businessType": "HoReCa",
+            "businessDescription": "Imported from a partner form",
+            "email": f"lead{i % unique}@example.com",
+            "phone": f"+7700{i % unique:07d}",
+        })
+        for i in range(rows)
+    )
+    return "\n".join(lines).encode()
+
+
+async def run(args):
+    body = ndjson_body(args.rows, args.duplicates)
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/leads/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+            )
+            elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    result = response.json()
+    print(
+        f"{args.rows} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s): "
+        f"created={result['created']} duplicates={result['duplicates']} invalid={result['invalid']}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--duplicates", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,130 @@
+"""Load benchmark for POST /api/leads.
+
+Fires concurrent submissions at the app in-process (httpx + ASGITransport,
+so no network noise) and reports requests/sec for two variants:
+
+  sync      the original handler: async def endpoint on a blocking Session
+  async     the current app on the async engine, one commit per request
+  buffered  the current app with the group-commit write buffer (ingest.py)
+
+Keep --concurrency at or below 15: the sync baseline runs on SQLAlchemy's
+default 5+10 connection pool and stalls once every connection is checked out.
+
+Usage (from turan-landing/backend, needs httpx):
+  python benchmarks/bench_create_lead.py --requests 2000 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+WORKDIR = tempfile.mkdtemp(prefix="turan-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR}/async.db"
+os.environ["LEAD_RATE_LIMIT"] = "off"  # one client, many requests
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+import ingest  # noqa: E402
+import main  # noqa: E402
+from database import Base, SessionLocal  # noqa: E402
+from models import Lead  # noqa: E402
+from schemas import LeadCreate, LeadResponse  # noqa: E402
+
+PAYLOAD = {
+    "name": "Bench User",
+    "businessName": "Bench Cafe",
+    "businessType": "HoReCa",
+    "businessDescription": "Coffee shop in Almaty " * 10,
+    "email": "bench@example.com",
+    "phone": "+77000000000",
+    "featuresNeeded": '["menu", "booking"]',
+}
+
+
+def build_sync_app() -> FastAPI:
+    """The pre-async handler, kept here only as a baseline."""
+    sync_engine = create_engine(
+        f"sqlite:///{WORKDIR}/sync.db", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.post("/api/leads", response_model=LeadResponse)
+    async def create_lead(lead: LeadCreate, db: Session = Depends(get_sync_db)):
+        db_lead = Lead(
+            name=lead.name,
+            business_name=lead.businessName,
+            business_type=lead.businessType,
+            business_description=lead.businessDescription,
+            email=lead.email,
+            phone=lead.phone,
+            selected_theme=lead.selectedTheme,
+            features_needed=lead.featuresNeeded,
+        )
+        db.add(db_lead)
+        db.commit()
+        db.refresh(db_lead)
+        return db_lead
+
+    return app
+
+
+async def hammer(app: FastAPI, total: int, concurrency: int, run: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for n in remaining:
+                # Distinct emails, or idempotency would turn repeats into lookups
+                response = await client.post(
+                    "/api/leads", json={**PAYLOAD, "email": f"{run}{n}@example.kz"}
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+async def run(total: int, concurrency: int):
+    print(f"POST /api/leads  requests={total}  concurrency={concurrency}")
+
+    rps = await hammer(build_sync_app(), total, concurrency, "sync")
+    print(f"  sync  session : {rps:8.1f} req/s")
+
+    async with main.lifespan(main.app):
+        rps = await hammer(main.app, total, concurrency, "async")
+        print(f"  async session : {rps:8.1f} req/s")
+
+        main.app.state.write_buffer = ingest.LeadWriteBuffer(SessionLocal)
+        main.app.state.write_buffer.start()
+        rps = await hammer(main.app, total, concurrency, "buffer")
+        print(f"  write buffer  : {rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
@@ -0,0 +1,83 @@
+"""Memory and throughput of the streaming lead export.
+
+Seeds a scratch database with --rows leads, then drains export.export_leads
+(the generator behind GET /api/leads/export) and reports peak RSS before and
+after, so growth with row count is easy to spot.
+
+Under the default "wal" storage profile RSS also includes SQLite's mmap window
+(up to 256 MiB) and page cache (64 MiB) as pages are touched. Run with
+LEADS_STORAGE_PROFILE=legacy to see the exporter's own footprint.
+
+Usage (from turan-landing/backend):
+  python benchmarks/bench_export.py --rows 1000000 --format csv --gzip
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+WORKDIR = tempfile.mkdtemp(prefix="turan-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR}/export.db"
+
+import crud  # noqa: E402
+import export  # noqa: E402
+import main  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from schemas import LeadFilters  # noqa: E402
+
+SEED_BATCH = 10_000
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def seed_row(i: int) -> dict:
+    return dict(
+        name=f"Bench {i}",
+        business_name="Bench Cafe",
+        business_type="HoReCa",
+        business_description="Coffee shop in Almaty " * 10,
+        email="bench@example.com",
+        phone="+77000000000",
+        selected_theme="ios26",
+    )
+
+
+async def run(args):
+    async with main.lifespan(main.app):
+        for start in range(0, args.rows, SEED_BATCH):
+            async with SessionLocal() as db:
+                count = min(SEED_BATCH, args.rows - start)
+                await crud.insert_leads(db, [seed_row(start + i) for i in range(count)])
+                await db.commit()
+        print(f"seeded {args.rows} rows, peak RSS {peak_rss_mb():.1f} MB")
+
+        started = time.perf_counter()
+        total = 0
+        async for chunk in export.export_leads(SessionLocal, LeadFilters(), args.format, args.gzip):
+            total += len(chunk)
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"exported {args.format}{' (gzip)' if args.gzip else ''}: {total / 1e6:.1f} MB "
+        f"in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s), peak RSS {peak_rss_mb():.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=sorted(export.MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    asyncio.run(run(parser.parse_args()))
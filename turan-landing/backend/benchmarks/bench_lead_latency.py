@@ -0,0 +1,130 @@
+"""Per-request latency of POST /api/leads on the direct (unbuffered) path.
+
+Submits leads one at a time, so the numbers are latency rather than
+throughput, and compares:
+
+  refresh    the previous handler: ORM add + flush, side tables, then a
+             refresh to read back the server-default created_at
+  returning  the current handler: one INSERT ... RETURNING via crud.insert_leads
+
+Reports p50/p95/p99 in milliseconds and SQL statements per request.
+
+Usage (from turan-landing/backend, needs httpx):
+  python benchmarks/bench_lead_latency.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+WORKDIR = tempfile.mkdtemp(prefix="turan-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR}/latency.db"
+os.environ["LEAD_RATE_LIMIT"] = "off"  # one client, many requests
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+import crud  # noqa: E402
+import features  # noqa: E402
+import idempotency  # noqa: E402
+import main  # noqa: E402
+import outbox  # noqa: E402
+import rollups  # noqa: E402
+from database import engine, get_db  # noqa: E402
+from models import Lead  # noqa: E402
+from schemas import LeadCreate, LeadResponse  # noqa: E402
+
+PAYLOAD = {
+    "name": "Bench User",
+    "businessName": "Bench Cafe",
+    "businessType": "HoReCa",
+    "businessDescription": "Coffee shop in Almaty " * 10,
+    "phone": "+77000000000",
+    "featuresNeeded": '["menu", "booking"]',
+}
+
+statements = 0
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+def build_refresh_app() -> FastAPI:
+    """The handler before INSERT ... RETURNING, kept here only as a baseline.
+
+    Writes the same side tables as crud.insert_leads; keep the two in step.
+    """
+    app = FastAPI()
+
+    @app.post("/api/leads", response_model=LeadResponse)
+    async def create_lead(lead: LeadCreate, db: AsyncSession = Depends(get_db)):
+        row = crud.lead_row(lead)
+        keys = idempotency.submission_keys(row)
+        original = await idempotency.find_lead(db, keys)
+        if original:
+            return original
+        db_lead = Lead(**row)
+        db.add(db_lead)
+        await db.flush()
+        await idempotency.add_keys(db, [(db_lead.id, keys)])
+        await features.add_features(db, features.feature_rows(db_lead.id, db_lead.features_needed))
+        await db.refresh(db_lead)
+        await rollups.add_leads(db, [db_lead])
+        await outbox.add_events(db, outbox.LEAD_CREATED, [db_lead])
+        await crud.bump_counter(db, crud.LEADS_COUNTER, 1)
+        await db.commit()
+        return db_lead
+
+    return app
+
+
+async def measure(app: FastAPI, total: int, run: str) -> tuple[list[float], float]:
+    global statements
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        statements = 0
+        for n in range(total):
+            started = time.perf_counter()
+            # Distinct emails, or idempotency would turn repeats into lookups
+            response = await client.post("/api/leads", json={**PAYLOAD, "email": f"{run}{n}@example.kz"})
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    return latencies, statements / total
+
+
+def report(label: str, latencies: list[float], per_request: float):
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:<10}: p50 {cuts[49]:6.2f} ms  p95 {cuts[94]:6.2f} ms  "
+        f"p99 {cuts[98]:6.2f} ms  {per_request:4.1f} statements/request"
+    )
+
+
+async def run(total: int):
+    print(f"POST /api/leads latency  requests={total}  (sequential)")
+    async with main.lifespan(main.app):
+        # Warm up both paths so connection setup is not in the numbers
+        await measure(build_refresh_app(), 20, "warm-a")
+        await measure(main.app, 20, "warm-b")
+        report("refresh", *await measure(build_refresh_app(), total, "refresh"))
+        report("returning", *await measure(main.app, total, "returning"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
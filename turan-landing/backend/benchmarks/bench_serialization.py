@@ -0,0 +1,114 @@
+"""Cost of serializing lead pages: Pydantic/ORM path vs the orjson fast path.
+
+Seeds a scratch database, then requests pages of 100, 1k and 10k leads
+through the app in-process and reports milliseconds per page for:
+
+  pydantic  Lead objects -> LeadResponse (from_attributes) -> FastAPI encoder
+  orjson    plain rows -> fastjson.page_response (one orjson.dumps call)
+
+Both routes call crud.get_leads_page like GET /api/leads does; the bench
+defines its own copies only because the real route caps ?limit at 500.
+The two bodies are checked to decode to the same JSON.
+
+Usage (from turan-landing/backend, needs httpx and orjson):
+  python benchmarks/bench_serialization.py --sizes 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+WORKDIR = tempfile.mkdtemp(prefix="turan-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR}/serialization.db"
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+import crud  # noqa: E402
+import fastjson  # noqa: E402
+import main  # noqa: E402
+from database import SessionLocal, get_db  # noqa: E402
+from schemas import LeadList  # noqa: E402
+
+ROUNDS = 5
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pydantic", response_model=LeadList)
+    async def pydantic_page(limit: int, db: AsyncSession = Depends(get_db)):
+        leads, next_cursor = await crud.get_leads_page(db, limit=limit)
+        return LeadList(leads=leads, total=limit, next_cursor=next_cursor)
+
+    @app.get("/orjson", response_model=LeadList)
+    async def orjson_page(limit: int, db: AsyncSession = Depends(get_db)):
+        leads, next_cursor = await crud.get_leads_page(db, limit=limit, columns=crud.RESPONSE_COLUMNS)
+        return fastjson.page_response(leads, limit, next_cursor)
+
+    return app
+
+
+async def seed(rows: int):
+    async with SessionLocal() as db:
+        for start in range(0, rows, 5000):
+            batch = [
+                {
+                    "name": f"Lead {n}",
+                    "business_name": f"Business {n}",
+                    "business_type": "HoReCa",
+                    "business_description": "Coffee shop in Almaty " * 10,
+                    "email": f"lead{n}@example.kz",
+                    "phone": "+77000000000",
+                    "selected_theme": "modern",
+                    "features_needed": '["menu", "booking"]',
+                    "agreed_to_terms": True,
+                }
+                for n in range(start, min(start + 5000, rows))
+            ]
+            await crud.insert_leads(db, batch)
+        await db.commit()
+
+
+async def timed(client: httpx.AsyncClient, path: str, size: int) -> tuple[float, bytes]:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        response = await client.get(path, params={"limit": size})
+        best = min(best, time.perf_counter() - started)
+        response.raise_for_status()
+    return best * 1000, response.content
+
+
+async def run(sizes: list[int]):
+    if fastjson.orjson is None:
+        sys.exit("orjson is not installed")
+    async with main.lifespan(main.app):
+        await seed(max(sizes) + 1)
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"GET lead pages, best of {ROUNDS}")
+            for size in sizes:
+                slow, slow_body = await timed(client, "/pydantic", size)
+                fast, fast_body = await timed(client, "/orjson", size)
+                assert json.loads(slow_body) == json.loads(fast_body), "bodies differ"
+                print(
+                    f"  {size:>6} rows: pydantic {slow:8.1f} ms  orjson {fast:8.1f} ms  "
+                    f"({slow / fast:.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes))
@@ -0,0 +1,102 @@
+"""Concurrent read/write throughput of leads.db under each storage profile.
+
+Writers insert leads one transaction at a time while readers page through
+the newest leads, the way the admin dashboard polls during a campaign.
+Each profile gets a fresh copy of the database (journal mode is persistent).
+
+Usage (from turan-landing/backend):
+  python benchmarks/bench_sqlite_profiles.py --seconds 5 --writers 4 --readers 8
+  python benchmarks/bench_sqlite_profiles.py --db leads.db   # start from real data
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+import crud  # noqa: E402
+from database import STORAGE_PROFILES, build_engine  # noqa: E402
+from main import create_schema  # noqa: E402
+from models import Lead  # noqa: E402
+
+SEED_ROWS = 2000
+
+
+def make_lead(i: int) -> Lead:
+    return Lead(
+        name=f"Bench {i}",
+        business_name="Bench Cafe",
+        business_description="Coffee shop in Almaty " * 10,
+        email="bench@example.com",
+        phone="+77000000000",
+    )
+
+
+async def run_profile(profile: str, db_path: Path, args) -> tuple[float, float]:
+    engine = build_engine(f"sqlite+aiosqlite:///{db_path}", profile)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(create_schema)
+    async with Session() as db:
+        await crud.seed_counter(db, crud.LEADS_COUNTER, Lead)
+        if not await crud.get_counter(db, crud.LEADS_COUNTER):
+            db.add_all(make_lead(i) for i in range(SEED_ROWS))
+            await crud.bump_counter(db, crud.LEADS_COUNTER, SEED_ROWS)
+            await db.commit()
+
+    stop = asyncio.Event()
+    counts = {"writes": 0, "reads": 0}
+
+    async def writer():
+        while not stop.is_set():
+            async with Session() as db:
+                db.add(make_lead(counts["writes"]))
+                await crud.bump_counter(db, crud.LEADS_COUNTER, 1)
+                await db.commit()
+            counts["writes"] += 1
+
+    async def reader():
+        while not stop.is_set():
+            async with Session() as db:
+                await crud.get_leads_page(db, limit=100)
+                await crud.get_counter(db, crud.LEADS_COUNTER)
+            counts["reads"] += 1
+
+    tasks = [asyncio.create_task(writer()) for _ in range(args.writers)]
+    tasks += [asyncio.create_task(reader()) for _ in range(args.readers)]
+    started = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return counts["writes"] / elapsed, counts["reads"] / elapsed
+
+
+async def run(args):
+    workdir = Path(tempfile.mkdtemp(prefix="turan-bench-"))
+    print(f"{args.writers} writers / {args.readers} readers for {args.seconds}s per profile")
+    for profile in STORAGE_PROFILES:
+        db_path = workdir / f"{profile}.db"
+        if args.db:
+            shutil.copy(args.db, db_path)
+        writes, reads = await run_profile(profile, db_path, args)
+        print(f"  {profile:8} writes {writes:8.1f}/s   reads {reads:8.1f}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--db", help="copy this database as the starting point")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""Bulk lead import for POST /api/leads/bulk.
+
+The body is either a JSON array or NDJSON (one LeadCreate object per line,
+streamed rather than buffered). Records are validated and written in chunks,
+one transaction per chunk, and every record gets a result: created, duplicate
+(same email + phone as an existing lead or an earlier record) or invalid.
+"""
+
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+from models import Lead
+from schemas import LeadCreate
+
+CHUNK_SIZE = 2000
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+class BadPayload(Exception):
+    pass
+
+
+async def read_records(content_type: str, stream: AsyncIterator[bytes]) -> AsyncIterator:
+    """Yield decoded records; an undecodable NDJSON line yields the exception."""
+    if content_type.split(";")[0].strip() in NDJSON_TYPES:
+        pending = b""
+        async for data in stream:
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _decode_line(line)
+        if pending.strip():
+            yield _decode_line(pending)
+        return
+
+    body = b"".join([data async for data in stream])
+    try:
+        records = json.loads(body)
+    except ValueError as exc:
+        raise BadPayload(f"Body is not valid JSON: {exc}") from exc
+    if not isinstance(records, list):
+        raise BadPayload("Expected a JSON array of leads")
+    for record in records:
+        yield record
+
+def _decode_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return exc
+
+
+class Importer:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # Plain dicts shaped like BulkRowResult; the response model validates them once
+        self.results: list[dict] = []
+        # (email, phone) -> lead id, for duplicates within this import
+        self.seen: dict[tuple[str, str], int] = {}
+
+    async def run(self, records: AsyncIterator) -> dict:
+        chunk = []
+        index = 0
+        async for record in records:
+            chunk.append((index, record))
+            index += 1
+            if len(chunk) >= CHUNK_SIZE:
+                await self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk)
+
+        self.results.sort(key=lambda result: result["index"])
+        statuses = [result["status"] for result in self.results]
+        return dict(
+            created=statuses.count("created"),
+            duplicates=statuses.count("duplicate"),
+            invalid=statuses.count("invalid"),
+            results=self.results,
+        )
+
+    async def _import_chunk(self, chunk: list[tuple[int, object]]):
+        valid: list[tuple[int, dict]] = []
+        for index, record in chunk:
+            if isinstance(record, Exception):
+                self.results.append({"index": index, "status": "invalid", "errors": [str(record)]})
+                continue
+            try:
+                lead = LeadCreate.model_validate(record)
+            except ValidationError as exc:
+                errors = [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()]
+                self.results.append({"index": index, "status": "invalid", "errors": errors})
+                continue
+            valid.append((index, crud.lead_row(lead)))
+
+        await self._load_existing({(row["email"], row["phone"]) for _, row in valid})
+
+        fresh: list[tuple[int, dict]] = []
+        fresh_keys: set[tuple[str, str]] = set()
+        repeats: list[tuple[int, tuple[str, str]]] = []  # repeats of records in this chunk
+        for index, row in valid:
+            key = (row["email"], row["phone"])
+            if key in self.seen:
+                self.results.append({"index": index, "status": "duplicate", "id": self.seen[key]})
+            elif key in fresh_keys:
+                repeats.append((index, key))
+            else:
+                fresh_keys.add(key)
+                fresh.append((index, row))
+
+        if fresh:
+            leads = await crud.insert_leads(self.db, [row for _, row in fresh])
+            await self.db.commit()
+            for (index, row), lead in zip(fresh, leads):
+                self.seen[(row["email"], row["phone"])] = lead["id"]
+                self.results.append({"index": index, "status": "created", "id": lead["id"]})
+
+        for index, key in repeats:
+            self.results.append({"index": index, "status": "duplicate", "id": self.seen[key]})
+
+    async def _load_existing(self, keys: set[tuple[str, str]]):
+        keys -= self.seen.keys()
+        if not keys:
+            return
+        # SQLite plans a row-value IN as a full index scan, so search by email
+        # (the leading index column) and match the phone here.
+        stmt = (
+            select(Lead.email, Lead.phone, Lead.id)
+            .where(Lead.email.in_({email for email, _ in keys}))
+            .order_by(Lead.id.desc())
+        )
+        # Descending so the oldest lead for a key wins
+        for email, phone, lead_id in await self.db.execute(stmt):
+            if (email, phone) in keys:
+                self.seen[(email, phone)] = lead_id
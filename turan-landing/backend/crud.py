@@ -0,0 +1,231 @@
+import base64
+import json
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import features
+import idempotency
+import outbox
+import rollups
+import search
+from models import Counter, Lead
+from schemas import LeadCreate, LeadFilters, LeadResponse, LeadSummary
+
+LEADS_COUNTER = "leads"
+
+# Columns selected for ?fields=summary and for row-based (fastjson) pages,
+# kept in step with the schemas
+SUMMARY_COLUMNS = tuple(getattr(Lead, name) for name in LeadSummary.model_fields)
+RESPONSE_COLUMNS = tuple(getattr(Lead, name) for name in LeadResponse.model_fields)
+
+
+# Counters
+
+async def seed_counter(db: AsyncSession, name: str, model):
+    """Create the counter row from a one-off COUNT(*) if it does not exist yet."""
+    if await db.get(Counter, name) is None:
+        count = await db.scalar(select(func.count()).select_from(model))
+        db.add(Counter(name=name, value=count))
+        await db.commit()
+
+async def get_counter(db: AsyncSession, name: str) -> int:
+    value = await db.scalar(select(Counter.value).where(Counter.name == name))
+    return value or 0
+
+async def bump_counter(db: AsyncSession, name: str, delta: int):
+    """Adjust a counter inside the caller's transaction."""
+    await db.execute(
+        update(Counter)
+        .where(Counter.name == name)
+        .values(value=Counter.value + delta)
+    )
+
+
+# Writes
+
+def lead_row(lead: LeadCreate) -> dict:
+    """Column values for a submitted brief."""
+    return dict(
+        name=lead.name,
+        business_name=lead.businessName,
+        business_type=lead.businessType,
+        business_description=lead.businessDescription,
+        target_audience=lead.targetAudience,
+        email=lead.email,
+        phone=lead.phone,
+        selected_theme=lead.selectedTheme,
+        preferred_colors=lead.preferredColors,
+        website_goal=lead.websiteGoal,
+        features_needed=lead.featuresNeeded,
+        has_logo=lead.hasLogo,
+        has_content=lead.hasContent,
+        has_photos=lead.hasPhotos,
+        competitors=lead.competitors,
+        additional_notes=lead.additionalNotes,
+        budget_range=lead.budgetRange,
+        deadline=lead.deadline,
+        agreed_to_terms=lead.agreedToTerms,
+    )
+
+async def insert_leads(
+    db: AsyncSession,
+    rows: list[dict],
+    keys: Optional[list[list[str]]] = None,
+    ignore_key_conflicts: bool = True,
+) -> list[dict]:
+    """Insert many leads as one multi-row INSERT ... RETURNING; caller commits.
+
+    Returns each row, in order, with its id and created_at filled in. No ORM
+    objects are built and nothing is read back afterwards, so this is the path
+    for single submissions and bulk imports alike. ``keys`` are the rows'
+    submission keys (see idempotency.py); by default each row gets its content
+    key. A key another lead already holds is left with that lead, or raises
+    IntegrityError without ``ignore_key_conflicts``.
+    """
+    # sort_by_parameter_order=True would make SQLAlchemy fall back to one
+    # INSERT per row on SQLite. Ids are handed out in VALUES order within the
+    # transaction, so sorting the returned ids restores the row order instead.
+    # Core insert on the table skips the ORM's per-row bulk bookkeeping.
+    stmt = insert(Lead.__table__).returning(Lead.id, Lead.created_at)
+    returned = sorted((await db.execute(stmt, rows)).all())
+    leads = [
+        {**row, "id": lead_id, "created_at": created_at}
+        for row, (lead_id, created_at) in zip(rows, returned)
+    ]
+    # Keys first, so a conflicting submission fails before the side tables
+    if keys is None:
+        keys = [idempotency.submission_keys(lead, day=lead["created_at"].date()) for lead in leads]
+    await idempotency.add_keys(
+        db,
+        [(lead["id"], lead_keys) for lead, lead_keys in zip(leads, keys)],
+        ignore_conflicts=ignore_key_conflicts,
+    )
+    feature_rows = [
+        row for lead in leads for row in features.feature_rows(lead["id"], lead.get("features_needed"))
+    ]
+    await features.add_features(db, feature_rows)
+    await rollups.add_leads(db, leads)
+    await outbox.add_events(db, outbox.LEAD_CREATED, leads)
+    await bump_counter(db, LEADS_COUNTER, len(leads))
+    return leads
+
+async def insert_leads_once(
+    db: AsyncSession, rows: list[dict], keys: list[list[str]]
+) -> tuple[list, list[dict], list[bool]]:
+    """Insert only rows whose submission keys are new; caller commits.
+
+    Returns the lead for every row, in order, the leads actually created, and
+    for every row whether it was a repeat. A repeat of a stored lead gets that
+    Lead back; a repeat of an earlier row in ``rows`` gets that row's new lead.
+    """
+    existing = await idempotency.find_lead_ids(db, [key for row_keys in keys for key in row_keys])
+    fresh_rows, fresh_keys = [], []
+    claimed: dict[str, int] = {}  # key -> index into fresh_rows
+    plan: list[tuple[bool, int]] = []  # (is_new, fresh index or existing lead id)
+    replayed: list[bool] = []
+    for row, row_keys in zip(rows, keys):
+        lead_id = next((existing[key] for key in row_keys if key in existing), None)
+        if lead_id is not None:
+            plan.append((False, lead_id))
+            replayed.append(True)
+            continue
+        index = next((claimed[key] for key in row_keys if key in claimed), None)
+        replayed.append(index is not None)
+        if index is None:
+            index = len(fresh_rows)
+            fresh_rows.append(row)
+            fresh_keys.append(row_keys)
+            claimed.update((key, index) for key in row_keys)
+        plan.append((True, index))
+
+    created = await insert_leads(db, fresh_rows, fresh_keys) if fresh_rows else []
+    originals = {}
+    if existing:
+        stmt = select(Lead).where(Lead.id.in_(set(existing.values())))
+        originals = {lead.id: lead for lead in await db.scalars(stmt)}
+    leads = [created[ref] if is_new else originals[ref] for is_new, ref in plan]
+    return leads, created, replayed
+
+
+# Filtering
+
+def lead_conditions(db: AsyncSession, filters: LeadFilters) -> list:
+    conditions = []
+    for name in ("business_type", "selected_theme", "budget_range", "website_goal"):
+        value = getattr(filters, name)
+        if value:
+            conditions.append(getattr(Lead, name) == value)
+    if filters.created_from:
+        conditions.append(Lead.created_at >= datetime.combine(filters.created_from, time.min))
+    if filters.created_to:
+        next_day = filters.created_to + timedelta(days=1)
+        conditions.append(Lead.created_at < datetime.combine(next_day, time.min))
+    if filters.feature:
+        conditions.append(features.feature_condition(filters.feature))
+    if filters.q:
+        condition = search.search_condition(db.get_bind().dialect.name, filters.q)
+        if condition is not None:
+            conditions.append(condition)
+    return conditions
+
+async def count_leads(db: AsyncSession, filters: LeadFilters) -> int:
+    """Unfiltered totals come from the counter; filtered ones from the indexes."""
+    if filters.is_empty():
+        return await get_counter(db, LEADS_COUNTER)
+    conditions = lead_conditions(db, filters)
+    return await db.scalar(select(func.count()).select_from(Lead).where(*conditions))
+
+
+# Keyset pagination
+
+def encode_cursor(lead: Lead) -> str:
+    raw = json.dumps([lead.created_at.isoformat(), lead.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError for anything that is not a cursor we issued."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, lead_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(lead_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+async def get_leads_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    filters: Optional[LeadFilters] = None,
+    columns: Optional[tuple] = None,
+) -> tuple[list, Optional[str]]:
+    """One page of leads in the requested order plus the cursor for the next page.
+
+    With ``columns`` only those are selected and rows come back as tuples
+    rather than Lead objects; they must include ``id`` and ``created_at``.
+    """
+    filters = filters or LeadFilters()
+    key = tuple_(Lead.created_at, Lead.id)
+    stmt = select(*columns) if columns else select(Lead)
+    stmt = stmt.where(*lead_conditions(db, filters))
+    if filters.sort == "oldest":
+        stmt = stmt.order_by(Lead.created_at.asc(), Lead.id.asc())
+    else:
+        stmt = stmt.order_by(Lead.created_at.desc(), Lead.id.desc())
+
+    if cursor:
+        position = decode_cursor(cursor)
+        stmt = stmt.where(key > position if filters.sort == "oldest" else key < position)
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    # One extra row tells us whether another page exists
+    stmt = stmt.limit(limit + 1)
+    leads = (await db.execute(stmt)).all() if columns else (await db.scalars(stmt)).all()
+    if len(leads) <= limit:
+        return leads, None
+    leads = leads[:limit]
+    return leads, encode_cursor(leads[-1])
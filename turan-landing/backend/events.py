@@ -0,0 +1,139 @@
+"""Live lead feed for the admin dashboard (Server-Sent Events).
+
+Writers publish a delta after their commit: ``created`` with the summary row,
+``deleted`` with the id, or ``reset`` when too much changed at once (bulk
+imports) and the dashboard should simply reload. Events fan out from memory,
+so any number of open dashboards costs no database queries.
+
+Every event id is ``<boot>-<seq>``. A reconnecting client sends the last id
+it saw (EventSource does this via Last-Event-ID) and gets the missed events
+replayed from a bounded history; if they are no longer there, or the server
+restarted in between, it gets a ``reset`` instead.
+
+Streams never end on their own, and the server waits for open responses
+before it shuts down; ``close_on_exit_signals`` ends them as soon as the exit
+signal arrives, and the app closes the hub again on shutdown.
+"""
+
+import asyncio
+import json
+import signal
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from schemas import LeadSummary
+
+HISTORY_SIZE = 1000
+SUBSCRIBER_QUEUE_SIZE = 1000
+HEARTBEAT_SECONDS = 15
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event: str):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: end the stream, the client resumes from history
+            self.close()
+
+    def close(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class LeadEventHub:
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self.boot = format(int(time.time()), "x")
+        self._seq = 0
+        self._history: deque[tuple[int, str]] = deque(maxlen=history_size)
+        self._subscribers: set[_Subscriber] = set()
+
+    # Publishing
+
+    def lead_created(self, leads: list):
+        for lead in leads:
+            summary = LeadSummary.model_validate(lead).model_dump(mode="json")
+            self._publish("created", summary)
+
+    def lead_deleted(self, lead_id: int):
+        self._publish("deleted", {"id": lead_id})
+
+    def reset(self):
+        self._publish("reset", {})
+
+    def close(self):
+        """End every open stream (server shutdown); clients reconnect and resume."""
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+
+    def _publish(self, kind: str, data: dict):
+        self._seq += 1
+        event = self._format(f"{self.boot}-{self._seq}", kind, data)
+        self._history.append((self._seq, event))
+        for subscriber in self._subscribers:
+            subscriber.offer(event)
+
+    @staticmethod
+    def _format(event_id: Optional[str], kind: str, data: dict) -> str:
+        id_line = f"id: {event_id}\n" if event_id else ""
+        return f"{id_line}event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    # Subscribing
+
+    def _replay(self, last_event_id: Optional[str]) -> list[str]:
+        if not last_event_id:
+            return []
+        boot, _, seq = last_event_id.partition("-")
+        if boot != self.boot or not seq.isdigit():
+            return [self._format(None, "reset", {})]
+        seq = int(seq)
+        if seq >= self._seq:
+            return []
+        if not self._history or self._history[0][0] > seq + 1:
+            return [self._format(None, "reset", {})]
+        return [event for event_seq, event in self._history if event_seq > seq]
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        subscriber = _Subscriber()
+        self._subscribers.add(subscriber)
+        try:
+            # Reconnect quickly; the history covers the gap
+            yield "retry: 2000\n\n"
+            for event in self._replay(last_event_id):
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+hub = LeadEventHub()
+
+def close_on_exit_signals(hub: LeadEventHub, signals=(signal.SIGINT, signal.SIGTERM)):
+    """Close ``hub`` when an exit signal arrives, then run the server's own handler."""
+    if threading.current_thread() is not threading.main_thread():
+        return  # signal handlers can only be set from the main thread
+    loop = asyncio.get_running_loop()
+    for sig in signals:
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue  # nothing to chain to; leave the default behaviour alone
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(hub.close)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
@@ -0,0 +1,89 @@
+"""Streaming bulk export of leads as NDJSON or CSV.
+
+Rows are read through a server-side cursor in fixed-size partitions and
+encoded (and optionally gzipped) one partition at a time, so memory stays
+flat no matter how many leads match. NDJSON rows are encoded with orjson
+when it is installed (see fastjson.py).
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+import crud
+import fastjson
+from models import Lead
+from schemas import LeadFilters
+
+EXPORT_COLUMNS = crud.RESPONSE_COLUMNS
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+PARTITION_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _ndjson(rows) -> bytes:
+    if fastjson.enabled:
+        return fastjson.ndjson(rows)
+    return "".join(
+        json.dumps(dict(row._mapping), default=_iso, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+def _iso(value):
+    return value.isoformat()
+
+class _CsvEncoder:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def header(self) -> str:
+        self.writer.writerow(EXPORT_FIELDS)
+        return self._drain()
+
+    def rows(self, rows) -> str:
+        self.writer.writerows(rows)
+        return self._drain()
+
+    def _drain(self) -> str:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+
+async def export_leads(
+    session_factory, filters: LeadFilters, fmt: str, compress: bool
+) -> AsyncIterator[bytes]:
+    gzip = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+
+    def emit(data: bytes) -> bytes:
+        return gzip.compress(data) if gzip else data
+
+    csv_encoder = _CsvEncoder() if fmt == "csv" else None
+    if csv_encoder:
+        yield emit(csv_encoder.header().encode())
+
+    async with session_factory() as db:
+        stmt = select(*EXPORT_COLUMNS).where(*crud.lead_conditions(db, filters))
+        if filters.sort == "oldest":
+            stmt = stmt.order_by(Lead.created_at.asc(), Lead.id.asc())
+        else:
+            stmt = stmt.order_by(Lead.created_at.desc(), Lead.id.desc())
+
+        result = await db.stream(stmt.execution_options(yield_per=PARTITION_SIZE))
+        async for rows in result.partitions():
+            chunk = emit(csv_encoder.rows(rows).encode() if csv_encoder else _ndjson(rows))
+            if chunk:
+                yield chunk
+
+    if gzip:
+        yield gzip.flush()
@@ -0,0 +1,45 @@
+"""orjson fast path for the read-only lead endpoints.
+
+GET /api/leads normally loads Lead objects, validates them into LeadResponse
+(from_attributes, one getattr per field per row) and lets FastAPI serialize
+the result. With orjson installed the page is instead selected as plain rows
+and encoded straight to JSON bytes; the export's NDJSON rows go the same way.
+The output is the same JSON either way.
+
+On by default when the optional ``orjson`` package is importable; set
+LEAD_FAST_JSON=off to always take the Pydantic path.
+"""
+
+import os
+from typing import Optional
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+LEAD_FAST_JSON = os.getenv("LEAD_FAST_JSON", "on")  # on | off
+
+enabled = orjson is not None and LEAD_FAST_JSON == "on"
+
+
+def dumps(obj) -> bytes:
+    # Datetimes come out as Pydantic writes them: naive ones without an offset,
+    # UTC ones with "Z" rather than orjson's default "+00:00"
+    return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+
+def rows_as_dicts(rows) -> list[dict]:
+    if not rows:
+        return []
+    fields = tuple(rows[0]._fields)
+    return [dict(zip(fields, row)) for row in rows]
+
+def page_response(rows, total: int, next_cursor: Optional[str]) -> Response:
+    """A LeadList / LeadSummaryList body from selected rows, encoded in one call."""
+    body = dumps({"leads": rows_as_dicts(rows), "total": total, "next_cursor": next_cursor})
+    return Response(body, media_type="application/json")
+
+def ndjson(rows) -> bytes:
+    return b"".join(dumps(row) + b"\n" for row in rows_as_dicts(rows))
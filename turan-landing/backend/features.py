@@ -0,0 +1,93 @@
+"""Normalized storage of the features a brief asks for.
+
+The form submits ``featuresNeeded`` as a JSON array of labels and it is kept
+verbatim in ``leads.features_needed``. Each label is also written as a row of
+``lead_features`` (lead_id, feature), so ``?feature=`` filters and per-feature
+counts are index lookups instead of parsing every lead's JSON.
+
+Leads written before the table existed are backfilled once at startup.
+"""
+
+import json
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Lead, LeadFeature
+
+BACKFILL_BATCH = 5000
+
+logger = logging.getLogger(__name__)
+
+
+def parse_features(features_needed: Optional[str]) -> list[str]:
+    """Distinct, trimmed labels from the submitted JSON; anything else is ignored."""
+    if not features_needed:
+        return []
+    try:
+        labels = json.loads(features_needed)
+    except ValueError:
+        return []
+    if not isinstance(labels, list):
+        return []
+    features = []
+    for label in labels:
+        if isinstance(label, str) and label.strip() and label.strip() not in features:
+            features.append(label.strip())
+    return features
+
+def feature_rows(lead_id: int, features_needed: Optional[str]) -> list[dict]:
+    return [{"lead_id": lead_id, "feature": f} for f in parse_features(features_needed)]
+
+
+# Migration
+
+def backfill(conn) -> int:
+    """Rebuild lead_features for every lead, in id-ordered batches."""
+    conn.execute(delete(LeadFeature))
+    written = 0
+    last_id = 0
+    while True:
+        batch = conn.execute(
+            select(Lead.id, Lead.features_needed)
+            .where(Lead.id > last_id, Lead.features_needed.is_not(None))
+            .order_by(Lead.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not batch:
+            break
+        rows = [row for lead_id, text in batch for row in feature_rows(lead_id, text)]
+        if rows:
+            conn.execute(insert(LeadFeature), rows)
+        written += len(rows)
+        last_id = batch[-1].id
+    logger.info("Backfilled %d lead features", written)
+    return written
+
+
+# Writes (caller commits)
+
+async def add_features(db: AsyncSession, rows: list[dict]):
+    if rows:
+        await db.execute(insert(LeadFeature), rows)
+
+async def remove_features(db: AsyncSession, lead_id: int):
+    await db.execute(delete(LeadFeature).where(LeadFeature.lead_id == lead_id))
+
+
+# Reads
+
+def feature_condition(feature: str):
+    return Lead.id.in_(select(LeadFeature.lead_id).where(LeadFeature.feature == feature))
+
+async def feature_counts(db: AsyncSession) -> list[tuple[str, int]]:
+    """(feature, leads) pairs, most requested first; a scan of the feature index only."""
+    count = func.count().label("count")
+    stmt = (
+        select(LeadFeature.feature, count)
+        .group_by(LeadFeature.feature)
+        .order_by(count.desc(), LeadFeature.feature)
+    )
+    return [tuple(row) for row in await db.execute(stmt)]
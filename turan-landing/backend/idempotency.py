@@ -0,0 +1,111 @@
+"""Repeat-submission detection for POST /api/leads.
+
+Every lead is stored with a content key, a hash of (email, phone,
+business_name, UTC submission date), plus the client's Idempotency-Key header
+when one was sent. The keys are the primary key of ``lead_submission_keys``,
+so a double-clicked submit finds the original lead with one index lookup and
+gets it back instead of creating a second row.
+
+Keys are deleted with their lead, so a brief removed by an admin can be
+submitted again. Leads from before the table existed get content keys
+backfilled once at startup (oldest lead wins).
+"""
+
+import hashlib
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Lead, LeadSubmissionKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+BACKFILL_BATCH = 5000
+
+
+def content_key(email: str, phone: str, business_name: Optional[str], day: date) -> str:
+    normalized = "\x1f".join([
+        email.strip().lower(),
+        re.sub(r"\D", "", phone),
+        (business_name or "").strip().lower(),
+        day.isoformat(),
+    ])
+    return "content:" + hashlib.sha256(normalized.encode()).hexdigest()
+
+def submission_keys(row: dict, idempotency_key: Optional[str] = None, day: Optional[date] = None) -> list[str]:
+    """Keys for a lead row; ``day`` defaults to today (UTC), i.e. a new submission."""
+    day = day or datetime.now(timezone.utc).date()
+    keys = [content_key(row["email"], row["phone"], row["business_name"], day)]
+    if idempotency_key:
+        keys.append(f"idempotency:{idempotency_key}")
+    return keys
+
+
+# Lookups
+
+async def find_lead(db: AsyncSession, keys: list[str]) -> Optional[Lead]:
+    """The lead already stored under any of these keys, if there is one."""
+    stmt = (
+        select(Lead)
+        .join(LeadSubmissionKey, LeadSubmissionKey.lead_id == Lead.id)
+        .where(LeadSubmissionKey.key.in_(keys))
+        .limit(1)
+    )
+    return await db.scalar(stmt)
+
+async def find_lead_ids(db: AsyncSession, keys: list[str]) -> dict[str, int]:
+    if not keys:
+        return {}
+    stmt = select(LeadSubmissionKey.key, LeadSubmissionKey.lead_id).where(LeadSubmissionKey.key.in_(keys))
+    return dict((await db.execute(stmt)).all())
+
+
+# Writes (caller commits)
+
+async def add_keys(db: AsyncSession, leads: list[tuple[int, list[str]]], ignore_conflicts: bool = False):
+    """Store keys for new leads.
+
+    By default a key that is already taken raises IntegrityError, which is how
+    a concurrent duplicate is noticed. With ``ignore_conflicts`` it is skipped.
+    """
+    rows = [{"key": key, "lead_id": lead_id} for lead_id, keys in leads for key in keys]
+    if not rows:
+        return
+    if ignore_conflicts:
+        stmt = _dialect(db.get_bind().dialect.name).insert(LeadSubmissionKey).on_conflict_do_nothing()
+    else:
+        stmt = insert(LeadSubmissionKey)
+    await db.execute(stmt, rows)
+
+async def remove_keys(db: AsyncSession, lead_id: int):
+    await db.execute(delete(LeadSubmissionKey).where(LeadSubmissionKey.lead_id == lead_id))
+
+def _dialect(name: str):
+    return postgresql if name == "postgresql" else sqlite
+
+
+# Migration
+
+def backfill(conn) -> None:
+    """Content keys for leads stored before lead_submission_keys existed."""
+    stmt = _dialect(conn.dialect.name).insert(LeadSubmissionKey).on_conflict_do_nothing()
+    last_id = 0
+    while True:
+        batch = conn.execute(
+            select(Lead.id, Lead.email, Lead.phone, Lead.business_name, Lead.created_at)
+            .where(Lead.id > last_id)
+            .order_by(Lead.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not batch:
+            return
+        rows = [
+            {"key": content_key(email, phone, business_name, created_at.date()), "lead_id": lead_id}
+            for lead_id, email, phone, business_name, created_at in batch
+        ]
+        conn.execute(stmt, rows)
+        last_id = batch[-1].id
@@ -0,0 +1,130 @@
+"""Group-commit ingestion for POST /api/leads.
+
+In buffered mode validated submissions are queued in memory and written in
+batches: one multi-row INSERT and one commit (one fsync) per batch instead of
+per request. A batch is flushed when it reaches LEAD_BUFFER_MAX_BATCH rows or
+LEAD_BUFFER_FLUSH_MS after its first row arrived, whichever comes first.
+
+Durability (LEAD_BUFFER_DURABILITY):
+  commit   the request waits until its batch is committed and gets the full
+           LeadResponse, exactly like direct mode (default)
+  enqueue  the request is answered with 202 as soon as it is queued; anything
+           still queued when the process dies is lost
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import crud
+import events
+import idempotency
+
+LEAD_INGEST_MODE = os.getenv("LEAD_INGEST_MODE", "direct")  # direct | buffered
+LEAD_BUFFER_MAX_BATCH = int(os.getenv("LEAD_BUFFER_MAX_BATCH", "200"))
+LEAD_BUFFER_FLUSH_MS = float(os.getenv("LEAD_BUFFER_FLUSH_MS", "10"))
+LEAD_BUFFER_MAX_PENDING = int(os.getenv("LEAD_BUFFER_MAX_PENDING", "10000"))
+LEAD_BUFFER_DURABILITY = os.getenv("LEAD_BUFFER_DURABILITY", "commit")  # commit | enqueue
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFull(Exception):
+    pass
+
+
+class LeadWriteBuffer:
+    def __init__(
+        self,
+        session_factory,
+        max_batch: int = LEAD_BUFFER_MAX_BATCH,
+        flush_ms: float = LEAD_BUFFER_FLUSH_MS,
+        max_pending: int = LEAD_BUFFER_MAX_PENDING,
+        durability: str = LEAD_BUFFER_DURABILITY,
+    ):
+        if durability not in ("commit", "enqueue"):
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+        self.durability = durability
+
+        self._pending: list[tuple[dict, list[str], Optional[asyncio.Future]]] = []
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Flush everything still queued, then stop."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+
+    async def submit(self, row: dict, keys: Optional[list[str]] = None) -> Optional[tuple]:
+        """Queue one lead. Returns the stored lead and whether the row was a
+        repeat, or None in enqueue mode.
+
+        A row whose submission ``keys`` match a stored lead, or another row
+        in the same batch, is not inserted again; it resolves to that lead.
+        """
+        if self._closing:
+            raise BufferFull("Write buffer is shutting down")
+        if len(self._pending) >= self.max_pending:
+            raise BufferFull("Write buffer is full")
+
+        future = None
+        if self.durability == "commit":
+            future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, keys or idempotency.submission_keys(row), future))
+        if len(self._pending) in (1, self.max_batch):
+            self._wakeup.set()
+
+        if future is None:
+            return None
+        return await future
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Let the batch fill up, unless it is already full or we are stopping
+            if len(self._pending) < self.max_batch and not self._closing:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, list[str], Optional[asyncio.Future]]]):
+        try:
+            async with self.session_factory() as db:
+                leads, created, replayed = await crud.insert_leads_once(
+                    db, [row for row, _, _ in batch], [keys for _, keys, _ in batch]
+                )
+                await db.commit()
+        except Exception as exc:
+            logger.exception("Failed to flush %d buffered leads", len(batch))
+            for _, _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+
+        events.hub.lead_created(created)
+        for (_, _, future), lead, repeat in zip(batch, leads, replayed):
+            if future is not None and not future.done():
+                future.set_result((lead, repeat))
@@ -1,18 +1,93 @@
-from fastapi import FastAPI, Depends, HTTPException, Request
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
-from typing import Optional
-
-from database import engine, get_db, Base
-from models import Lead
-from schemas import LeadCreate, LeadResponse, LeadList
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Literal, Optional, Union
+
+import assets
+import bulk
+import crud
+import events
+import export
+import fastjson
+import features
+import idempotency
+import ingest
+import metrics
+import outbox
+import ratelimit
+import replication
+import rollups
+import search
+from database import build_engine, engine, get_db, Base, SessionLocal
+from models import Lead, LeadFeature, LeadRollup, LeadSubmissionKey
+from schemas import (
+    BulkImportResult, FeatureStats, LeadCreate, LeadResponse, LeadList, LeadFilters, LeadStats,
+    LeadSummaryList,
+)
 
-app = FastAPI(title="Turan Landing API", version="2.0.0")
+def create_schema(conn):
+    # Checked before create_all, which would create them empty
+    backfill_features = not inspect(conn).has_table(LeadFeature.__tablename__)
+    build_rollups = not inspect(conn).has_table(LeadRollup.__tablename__)
+    backfill_keys = not inspect(conn).has_table(LeadSubmissionKey.__tablename__)
+    Base.metadata.create_all(bind=conn)
+    # create_all skips indexes on tables that already exist (older leads.db files)
+    for index in Lead.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+    search.create_search_index(conn)
+    if backfill_features:
+        features.backfill(conn)
+    if build_rollups:
+        rollups.rebuild(conn)
+    if backfill_keys:
+        idempotency.backfill(conn)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables
+    async with engine.begin() as conn:
+        await conn.run_sync(create_schema)
+    async with SessionLocal() as db:
+        await crud.seed_counter(db, crud.LEADS_COUNTER, Lead)
+
+    app.state.write_buffer = None
+    if ingest.LEAD_INGEST_MODE == "buffered":
+        app.state.write_buffer = ingest.LeadWriteBuffer(SessionLocal)
+        app.state.write_buffer.start()
+
+    consumers = []
+    if replication.LEADS_REPLICA_URL:
+        consumers.append(replication.ReplicaConsumer(SessionLocal, build_engine(replication.LEADS_REPLICA_URL)))
+    if outbox.LEAD_OUTBOX_WEBHOOK_URL:
+        consumers.append(outbox.WebhookConsumer(outbox.LEAD_OUTBOX_WEBHOOK_URL))
+    if consumers and not outbox.ids_follow_commits(engine):
+        raise RuntimeError(
+            "LEADS_REPLICA_URL / LEAD_OUTBOX_WEBHOOK_URL need a SQLite primary database: "
+            "outbox and replication cursors rely on ids committing in order"
+        )
+    # Runs without consumers too, to purge old events
+    dispatcher = outbox.OutboxDispatcher(SessionLocal, consumers)
+    dispatcher.start()
+    events.close_on_exit_signals(events.hub)
+    yield
+    events.hub.close()
+    if app.state.write_buffer:
+        await app.state.write_buffer.close()
+    await dispatcher.close()
+    await engine.dispose()
+
+app = FastAPI(title="Turan Landing API", version="2.0.0", lifespan=lifespan)
+
+# Admission control for lead writes; added before CORS so rejections carry CORS headers
+rate_limiter = ratelimit.RateLimiter.from_env()
+app.add_middleware(ratelimit.RateLimitMiddleware, limiter=rate_limiter)
 
 # CORS middleware
 app.add_middleware(
@@ -23,62 +98,233 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so rejected and CORS preflight requests are timed too
+if metrics.LEAD_METRICS == "on":
+    metrics.instrument_engine(engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": "Turan Landing API", "version": "2.0.0"}
 
-@app.post("/api/leads", response_model=LeadResponse)
-async def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
-    db_lead = Lead(
-        name=lead.name,
-        business_name=lead.businessName,
-        business_type=lead.businessType,
-        business_description=lead.businessDescription,
-        target_audience=lead.targetAudience,
-        email=lead.email,
-        phone=lead.phone,
-        selected_theme=lead.selectedTheme,
-        preferred_colors=lead.preferredColors,
-        website_goal=lead.websiteGoal,
-        features_needed=lead.featuresNeeded,
-        has_logo=lead.hasLogo,
-        has_content=lead.hasContent,
-        has_photos=lead.hasPhotos,
-        competitors=lead.competitors,
-        additional_notes=lead.additionalNotes,
-        budget_range=lead.budgetRange,
-        deadline=lead.deadline,
-        agreed_to_terms=lead.agreedToTerms,
-    )
-    db.add(db_lead)
-    db.commit()
-    db.refresh(db_lead)
+@app.post(
+    "/api/leads",
+    response_model=LeadResponse,
+    responses={202: {"description": "Queued for a buffered write (enqueue durability)"}},
+)
+async def create_lead(
+    lead: LeadCreate,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, alias=idempotency.HEADER, max_length=idempotency.MAX_KEY_LENGTH
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    row = crud.lead_row(lead)
+    keys = idempotency.submission_keys(row, idempotency_key)
+
+    # Repeat submission (double click, retry): answer with the stored lead
+    original = await idempotency.find_lead(db, keys)
+    if original:
+        response.headers["Idempotent-Replayed"] = "true"
+        return original
+
+    write_buffer = request.app.state.write_buffer
+    if write_buffer:
+        # Give the lookup's connection back to the pool; the flusher needs one
+        # while this request waits for it
+        await db.rollback()
+        try:
+            stored = await write_buffer.submit(row, keys)
+        except ingest.BufferFull:
+            raise HTTPException(
+                status_code=503, detail="Too many pending submissions", headers={"Retry-After": "1"}
+            )
+        if stored is None:
+            return JSONResponse(status_code=202, content={"status": "queued"})
+        db_lead, replayed = stored
+        if replayed:
+            # A repeat queued alongside the original, or stored since the lookup
+            response.headers["Idempotent-Replayed"] = "true"
+        return db_lead
+
+    # id and created_at come back from INSERT ... RETURNING; no refresh
+    try:
+        [db_lead] = await crud.insert_leads(db, [row], [keys], ignore_key_conflicts=False)
+    except IntegrityError:
+        # A concurrent identical submission committed first
+        await db.rollback()
+        response.headers["Idempotent-Replayed"] = "true"
+        return await idempotency.find_lead(db, keys)
+    await db.commit()
+    events.hub.lead_created([db_lead])
     return db_lead
 
-@app.get("/api/leads", response_model=LeadList)
+def lead_filters(
+    business_type: Optional[str] = None,
+    selected_theme: Optional[str] = None,
+    budget_range: Optional[str] = None,
+    website_goal: Optional[str] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    feature: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: Literal["newest", "oldest"] = "newest",
+) -> LeadFilters:
+    return LeadFilters(
+        business_type=business_type,
+        selected_theme=selected_theme,
+        budget_range=budget_range,
+        website_goal=website_goal,
+        created_from=created_from,
+        created_to=created_to,
+        feature=feature,
+        q=q,
+        sort=sort,
+    )
+
+@app.post("/api/leads/bulk", response_model=BulkImportResult)
+async def bulk_import_leads(request: Request, db: AsyncSession = Depends(get_db)):
+    """Import a JSON array or NDJSON stream of leads; see bulk.py."""
+    records = bulk.read_records(request.headers.get("content-type", ""), request.stream())
+    try:
+        result = await bulk.Importer(db).run(records)
+    except bulk.BadPayload as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if result["created"]:
+        # One reload beats thousands of row events
+        events.hub.reset()
+    return result
+
+@app.get("/api/leads", response_model=Union[LeadList, LeadSummaryList])
 async def get_leads(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    skip: int = Query(0, ge=0, deprecated=True),
+    fields: Literal["full", "summary"] = "full",
+    filters: LeadFilters = Depends(lead_filters),
+    db: AsyncSession = Depends(get_db)
 ):
-    leads = db.query(Lead).order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
-    total = db.query(Lead).count()
-    return LeadList(leads=leads, total=total)
+    if fields == "summary":
+        columns = crud.SUMMARY_COLUMNS
+    else:
+        columns = crud.RESPONSE_COLUMNS if fastjson.enabled else None
+    try:
+        leads, next_cursor = await crud.get_leads_page(
+            db, limit=limit, cursor=cursor, skip=skip, filters=filters, columns=columns
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    total = await crud.count_leads(db, filters)
+    if fastjson.enabled:
+        # Rows straight to JSON bytes; response_model still documents the shape
+        return fastjson.page_response(leads, total, next_cursor)
+    page = LeadSummaryList if fields == "summary" else LeadList
+    return page(leads=leads, total=total, next_cursor=next_cursor)
+
+@app.get("/api/leads/export")
+async def export_leads(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    filters: LeadFilters = Depends(lead_filters),
+):
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="leads.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export.export_leads(SessionLocal, filters, format, compress),
+        media_type=export.MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+@app.get("/api/leads/stats", response_model=LeadStats)
+async def get_lead_stats(
+    since: Optional[date] = Query(None, description="First day of by_day; all days if omitted"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Lead counts per day, business type, theme and budget, from lead_rollups."""
+    buckets = await rollups.get_buckets(db, since)
+
+    def as_list(dimension):
+        return [{"key": key, "count": count} for key, count in buckets[dimension]]
+
+    return LeadStats(
+        total=await crud.get_counter(db, crud.LEADS_COUNTER),
+        by_day=as_list(rollups.DAY),
+        by_business_type=as_list("business_type"),
+        by_selected_theme=as_list("selected_theme"),
+        by_budget_range=as_list("budget_range"),
+    )
+
+@app.get("/api/leads/stats/features", response_model=FeatureStats)
+async def get_feature_stats(db: AsyncSession = Depends(get_db)):
+    """How many leads asked for each feature, from the lead_features index."""
+    counts = await features.feature_counts(db)
+    return FeatureStats(features=[{"feature": f, "count": n} for f, n in counts])
+
+@app.get("/api/rate-limit")
+async def get_rate_limit_counters():
+    """Admitted and rejected lead writes since startup; see ratelimit.py."""
+    if rate_limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **rate_limiter.snapshot()}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition; enabled with LEAD_METRICS=on."""
+    if metrics.LEAD_METRICS != "on":
+        raise HTTPException(status_code=404, detail="Not found")
+    extra = []
+    if rate_limiter is not None:
+        counters = rate_limiter.snapshot()
+        extra += metrics.counter_lines(
+            "lead_write_requests_total",
+            "Lead write requests by rate limiter outcome.",
+            "outcome",
+            {name: counters[name] for name in rate_limiter.counters},
+        )
+        extra += [
+            "# HELP lead_writes_in_flight Lead writes currently holding a concurrency slot.",
+            "# TYPE lead_writes_in_flight gauge",
+            f"lead_writes_in_flight {counters['in_flight']}",
+        ]
+    return Response(metrics.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/leads/events")
+async def lead_events(request: Request, last_event_id: Optional[str] = None):
+    """Server-Sent Events feed of created/deleted leads; see events.py."""
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        events.hub.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/api/leads/{lead_id}", response_model=LeadResponse)
-async def get_lead(lead_id: int, db: Session = Depends(get_db)):
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+async def get_lead(lead_id: int, db: AsyncSession = Depends(get_db)):
+    lead = await db.get(Lead, lead_id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     return lead
 
 @app.delete("/api/leads/{lead_id}")
-async def delete_lead(lead_id: int, db: Session = Depends(get_db)):
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+async def delete_lead(lead_id: int, db: AsyncSession = Depends(get_db)):
+    lead = await db.get(Lead, lead_id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
-    db.delete(lead)
-    db.commit()
+    await features.remove_features(db, lead_id)
+    await idempotency.remove_keys(db, lead_id)
+    await rollups.remove_lead(db, lead)
+    await outbox.add_events(db, outbox.LEAD_DELETED, [lead])
+    await db.delete(lead)
+    await crud.bump_counter(db, crud.LEADS_COUNTER, -1)
+    await db.commit()
+    events.hub.lead_deleted(lead_id)
     return {"message": "Lead deleted successfully"}
 
 # Admin dashboard HTML
@@ -89,24 +335,8 @@ ADMIN_HTML = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Turan Admin - Complete Briefs</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script>
-        tailwind.config = {
-            theme: {
-                extend: {
-                    colors: {
-                        turan: {
-                            gold: '#D4AF37',
-                            bronze: '#CD7F32',
-                            dark: '#1A1A2E',
-                            navy: '#16213E',
-                            accent: '#0F3460',
-                        }
-                    }
-                }
-            }
-        }
-    </script>
+    <!-- Built from static/tailwind.config.js; the URL is filled in at startup -->
+    <link rel="stylesheet" href="{{ADMIN_CSS_URL}}">
     <style>
         body {
             background: linear-gradient(135deg, #1A1A2E 0%, #16213E 50%, #0F3460 100%);
@@ -132,6 +362,7 @@ ADMIN_HTML = '''
             <div class="flex items-center gap-4">
                 <span class="text-white/60">Total briefs:</span>
                 <span id="totalCount" class="text-2xl font-bold text-turan-gold">0</span>
+                <span id="liveStatus" class="text-xs text-white/40"></span>
             </div>
             <button onclick="loadLeads()" class="px-4 py-2 bg-white/10 hover:bg-white/20 rounded-lg transition-colors flex items-center gap-2">
                 <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 12a9 9 0 1 1-9-9c2.52 0 4.93 1 6.74 2.74L21 8"/><path d="M21 3v5h-5"/></svg>
@@ -139,10 +370,48 @@ ADMIN_HTML = '''
             </button>
         </div>
 
+        <form id="filters" class="mb-6 grid grid-cols-2 md:grid-cols-4 gap-3 text-sm" onsubmit="event.preventDefault(); loadLeads();">
+            <input name="q" type="search" placeholder="Search description, competitors, notes..." class="md:col-span-2 px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white placeholder-white/40">
+            <input name="business_type" placeholder="Business type" class="px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white placeholder-white/40">
+            <select name="sort" class="px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+                <option value="newest">Newest first</option>
+                <option value="oldest">Oldest first</option>
+            </select>
+            <select name="selected_theme" class="px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+                <option value="">Any theme</option>
+                <option value="ios26">iOS 26</option>
+                <option value="cyber">Cyber Horizon</option>
+                <option value="sunset">Sunset Silk</option>
+                <option value="forest">Emerald Deep</option>
+                <option value="chrome">Cosmic Chrome</option>
+            </select>
+            <select name="website_goal" class="px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+                <option value="">Any goal</option>
+                <option value="sales">Sales</option>
+                <option value="info">Info</option>
+                <option value="portfolio">Portfolio</option>
+                <option value="booking">Booking</option>
+            </select>
+            <select name="budget_range" class="px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+                <option value="">Any budget</option>
+                <option>50,000 - 100,000 ₸</option>
+                <option>100,000 - 200,000 ₸</option>
+                <option>200,000 - 500,000 ₸</option>
+                <option>500,000+ ₸</option>
+            </select>
+            <select id="featureFilter" name="feature" class="px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+                <option value="">Any feature</option>
+            </select>
+            <div class="flex gap-2">
+                <input name="created_from" type="date" class="w-full px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+                <input name="created_to" type="date" class="w-full px-3 py-2 bg-white/5 border border-white/10 rounded-lg text-white">
+            </div>
+        </form>
+
         <div class="bg-white/5 backdrop-blur-lg rounded-2xl border border-white/10 overflow-hidden">
-            <div class="overflow-x-auto">
+            <div id="leadsScroller" class="overflow-auto max-h-[70vh]">
                 <table class="w-full">
-                    <thead>
+                    <thead class="sticky top-0 bg-turan-navy z-10">
                         <tr class="border-b border-white/10">
                             <th class="px-4 py-4 text-left text-sm font-semibold text-white/80">ID</th>
                             <th class="px-4 py-4 text-left text-sm font-semibold text-white/80">Name</th>
@@ -179,82 +448,94 @@ ADMIN_HTML = '''
         </div>
     </div>
 
+    <script src="{{ADMIN_TABLE_JS_URL}}"></script>
     <script>
-        let allLeads = [];
+        function filterParams() {
+            const params = new URLSearchParams();
+            for (const [key, value] of new FormData(document.getElementById('filters'))) {
+                if (value) params.set(key, value);
+            }
+            return params;
+        }
+
+        // Rows are rendered by LeadTable (static/admin-table.js): only the visible
+        // ones are in the DOM, and more pages are fetched as the user scrolls.
+        const PAGE_SIZE = 200;
+        const table = new LeadTable({
+            tbody: document.getElementById('leadsTable'),
+            scroller: document.getElementById('leadsScroller'),
+            rowClass: 'border-b border-white/5 hover:bg-white/5 transition-colors',
+            onNeedMore: loadMore,
+        });
+        const details = new Map();  // id -> full brief, filled by viewDetails
+        let nextCursor = null;
+        let loadingMore = false;
+        let generation = 0;  // bumped by every reload, so stale pages are dropped
+
+        function messageRow(text, color = 'text-white/40') {
+            return `<td colspan="8" class="px-4 py-8 text-center ${color}">${text}</td>`;
+        }
+
+        function pageParams() {
+            const params = filterParams();
+            params.set('fields', 'summary');
+            params.set('limit', PAGE_SIZE);
+            return params;
+        }
 
         async function loadLeads() {
+            const current = ++generation;
             try {
-                const response = await fetch('/api/leads');
+                const response = await fetch('/api/leads?' + pageParams());
                 const data = await response.json();
-                allLeads = data.leads;
+                if (current !== generation) return;
 
                 document.getElementById('totalCount').textContent = data.total;
-
-                const tbody = document.getElementById('leadsTable');
+                nextCursor = data.next_cursor;
 
                 if (data.leads.length === 0) {
-                    tbody.innerHTML = `
-                        <tr>
-                            <td colspan="8" class="px-4 py-8 text-center text-white/40">
-                                No briefs yet. Share your landing page to start collecting leads!
-                            </td>
-                        </tr>
-                    `;
+                    const filtered = [...filterParams().keys()].some(key => key !== 'sort');
+                    table.showMessage(messageRow(filtered
+                        ? 'No briefs match these filters.'
+                        : 'No briefs yet. Share your landing page to start collecting leads!'));
                     return;
                 }
 
-                tbody.innerHTML = data.leads.map(lead => `
-                    <tr class="border-b border-white/5 hover:bg-white/5 transition-colors">
-                        <td class="px-4 py-4 text-white/60">#${lead.id}</td>
-                        <td class="px-4 py-4 font-medium">${lead.name}</td>
-                        <td class="px-4 py-4 text-white/80">
-                            <div class="font-medium">${lead.business_name || '-'}</div>
-                            <div class="text-xs text-white/50">${lead.business_type || ''}</div>
-                        </td>
-                        <td class="px-4 py-4">
-                            <a href="mailto:${lead.email}" class="text-turan-gold hover:underline block text-sm">${lead.email}</a>
-                            <a href="tel:${lead.phone}" class="text-white/60 hover:text-white text-sm">${lead.phone}</a>
-                        </td>
-                        <td class="px-4 py-4">
-                            <span class="px-2 py-1 rounded-full text-xs bg-white/10 capitalize">${lead.selected_theme}</span>
-                        </td>
-                        <td class="px-4 py-4 text-white/80 text-sm">${lead.budget_range || '-'}</td>
-                        <td class="px-4 py-4 text-white/60 text-sm">
-                            ${new Date(lead.created_at).toLocaleDateString()}
-                        </td>
-                        <td class="px-4 py-4 flex gap-2">
-                            <button
-                                onclick="viewDetails(${lead.id})"
-                                class="text-turan-gold hover:text-turan-bronze text-sm flex items-center gap-1"
-                            >
-                                <svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M2 12s3-7 10-7 10 7 10 7-3 7-10 7-10-7-10-7Z"/><circle cx="12" cy="12" r="3"/></svg>
-                                View
-                            </button>
-                            <button
-                                onclick="deleteLead(${lead.id})"
-                                class="text-red-400 hover:text-red-300 text-sm flex items-center gap-1"
-                            >
-                                <svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M3 6h18"/><path d="M19 6v14c0 1-1 2-2 2H7c-1 0-2-1-2-2V6"/><path d="M8 6V4c0-1 1-2 2-2h4c1 0 2 1 2 2v2"/></svg>
-                                Delete
-                            </button>
-                        </td>
-                    </tr>
-                `).join('');
+                table.reset(data.leads);
             } catch (error) {
                 console.error('Error loading leads:', error);
-                document.getElementById('leadsTable').innerHTML = `
-                    <tr>
-                        <td colspan="8" class="px-4 py-8 text-center text-red-400">
-                            Error loading leads. Please try again.
-                        </td>
-                    </tr>
-                `;
+                table.showMessage(messageRow('Error loading leads. Please try again.', 'text-red-400'));
             }
         }
 
-        function viewDetails(id) {
-            const lead = allLeads.find(l => l.id === id);
-            if (!lead) return;
+        async function loadMore() {
+            if (!nextCursor || loadingMore) return;
+            loadingMore = true;
+            const current = generation;
+            try {
+                const params = pageParams();
+                params.set('cursor', nextCursor);
+                const response = await fetch('/api/leads?' + params);
+                const data = await response.json();
+                if (current !== generation) return;
+                nextCursor = data.next_cursor;
+                table.append(data.leads);
+            } catch (error) {
+                console.error('Error loading more leads:', error);
+            } finally {
+                loadingMore = false;
+            }
+        }
+
+        async function viewDetails(id) {
+            // The table only holds summary rows; fetch the full brief once
+            let lead = details.get(id);
+            if (!lead) {
+                const response = await fetch(`/api/leads/${id}`);
+                if (!response.ok) return;
+                lead = await response.json();
+                details.set(id, lead);
+            }
 
             const features = lead.features_needed ? JSON.parse(lead.features_needed) : [];
 
@@ -382,7 +663,13 @@ ADMIN_HTML = '''
 
             try {
                 await fetch(`/api/leads/${id}`, { method: 'DELETE' });
-                loadLeads();
+                // The live feed updates the total; without it, reload
+                if (feed.readyState === EventSource.OPEN) {
+                    table.remove(id);
+                    details.delete(id);
+                } else {
+                    loadLeads();
+                }
             } catch (error) {
                 console.error('Error deleting lead:', error);
                 alert('Error deleting brief');
@@ -399,16 +686,105 @@ ADMIN_HTML = '''
             if (e.target.id === 'detailModal') closeModal();
         });
 
+        // Re-query the server whenever a filter changes
+        let searchTimer;
+        document.getElementById('filters').addEventListener('input', (e) => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(loadLeads, e.target.type === 'search' ? 300 : 0);
+        });
+
+        // Live feed: patch the table in place instead of re-fetching it.
+        // Only the unfiltered newest-first view shows new rows as they arrive.
+        function isDefaultView() {
+            const params = filterParams();
+            return [...params.keys()].every(key => key === 'sort') && params.get('sort') !== 'oldest';
+        }
+
+        function bumpTotal(delta) {
+            const total = document.getElementById('totalCount');
+            total.textContent = Math.max(0, Number(total.textContent) + delta);
+        }
+
+        // EventSource reconnects by itself and resumes from Last-Event-ID
+        const feed = new EventSource('/api/leads/events');
+        const liveStatus = document.getElementById('liveStatus');
+        feed.onopen = () => {
+            liveStatus.textContent = '● Live';
+            liveStatus.className = 'text-xs text-green-400';
+        };
+        feed.onerror = () => {
+            liveStatus.textContent = '● Reconnecting...';
+            liveStatus.className = 'text-xs text-white/40';
+        };
+
+        feed.addEventListener('created', (e) => {
+            const lead = JSON.parse(e.data);
+            if (!isDefaultView() || table.has(lead.id)) return;
+            table.prepend(lead);
+            bumpTotal(1);
+        });
+
+        feed.addEventListener('deleted', (e) => {
+            const { id } = JSON.parse(e.data);
+            table.remove(id);
+            details.delete(id);
+            if (isDefaultView()) bumpTotal(-1);
+        });
+
+        // Too much changed (bulk import, missed events): start over
+        feed.addEventListener('reset', () => loadLeads());
+
+        // Feature filter options, with how many leads asked for each
+        async function loadFeatureOptions() {
+            const response = await fetch('/api/leads/stats/features');
+            if (!response.ok) return;
+            const { features } = await response.json();
+            const select = document.getElementById('featureFilter');
+            for (const { feature, count } of features) {
+                select.add(new Option(`${feature} (${count})`, feature));
+            }
+        }
+
         // Load leads on page load
+        loadFeatureOptions();
+        table.showMessage(messageRow('Loading...'));
         loadLeads();
     </script>
 </body>
 </html>
 '''
 
+ADMIN_CSS = assets.StaticAsset(
+    (assets.STATIC_DIR / "admin.css").read_bytes(), "text/css; charset=utf-8", assets.IMMUTABLE
+)
+ADMIN_TABLE_JS = assets.StaticAsset(
+    (assets.STATIC_DIR / "admin-table.js").read_bytes(),
+    "text/javascript; charset=utf-8",
+    assets.IMMUTABLE,
+)
+ADMIN_ASSETS = {
+    f"admin.{ADMIN_CSS.digest}.css": ADMIN_CSS,
+    f"admin-table.{ADMIN_TABLE_JS.digest}.js": ADMIN_TABLE_JS,
+}
+ADMIN_PAGE = assets.StaticAsset(
+    ADMIN_HTML
+    .replace("{{ADMIN_CSS_URL}}", f"/admin/assets/admin.{ADMIN_CSS.digest}.css")
+    .replace("{{ADMIN_TABLE_JS_URL}}", f"/admin/assets/admin-table.{ADMIN_TABLE_JS.digest}.js")
+    .encode(),
+    "text/html; charset=utf-8",
+    assets.REVALIDATE,
+)
+
 @app.get("/admin", response_class=HTMLResponse)
-async def admin_dashboard():
-    return ADMIN_HTML
+async def admin_dashboard(request: Request):
+    return ADMIN_PAGE.response(request)
+
+@app.get("/admin/assets/{filename}", include_in_schema=False)
+async def admin_asset(filename: str, request: Request):
+    asset = ADMIN_ASSETS.get(filename)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return asset.response(request)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,181 @@
+"""Opt-in latency and database timing for the landing API (LEAD_METRICS=on).
+
+- Request latency per route template, method and status, measured from the
+  request arriving to the response headers going out. Streams (export, the
+  live feed) are counted up to their first byte, not for their lifetime.
+- Every SQL statement, timed with before/after_cursor_execute and labelled
+  by operation and table ("INSERT leads"), plus every COMMIT, which is
+  where SQLite pays for its fsync.
+- Statements slower than LEAD_SLOW_QUERY_MS are logged with their SQL text
+  and (truncated) parameters.
+
+GET /metrics serves all of it in the Prometheus text format.
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+LEAD_METRICS = os.getenv("LEAD_METRICS", "off")  # on | off
+LEAD_SLOW_QUERY_MS = float(os.getenv("LEAD_SLOW_QUERY_MS", "100"))
+
+# Seconds; Prometheus client defaults, plus 1 ms for SQLite statements
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+MAX_PARAMS_LOGGED = 500  # characters
+
+slow_query_logger = logging.getLogger("turan.slow_query")
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from request to response headers.",
+    ("method", "route", "status"),
+)
+STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing one SQL statement.",
+    ("statement",),
+)
+COMMIT_SECONDS = Histogram(
+    "db_commit_duration_seconds",
+    "Time spent in COMMIT, including the fsync.",
+    (),
+)
+
+
+# HTTP
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        observed = False
+
+        def observe(status: int):
+            route = scope.get("route")
+            # Route templates only, so unknown paths cannot create new series
+            template = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - started, scope["method"], template, str(status))
+
+        async def timed_send(message):
+            nonlocal observed
+            if message["type"] == "http.response.start" and not observed:
+                observed = True
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        except Exception:
+            if not observed:
+                observe(500)
+            raise
+
+
+# Database
+
+_OPERATION = re.compile(r"^\s*(\w+)")
+_TABLE = re.compile(r'\b(?:FROM|INTO|TABLE)\s+"?(\w+)|^\s*UPDATE\s+"?(\w+)', re.IGNORECASE)
+
+def statement_label(statement: str) -> str:
+    """Operation and first table, e.g. "INSERT leads"; keeps the label set small."""
+    operation = _OPERATION.match(statement)
+    if not operation:
+        return "OTHER"
+    table = _TABLE.search(statement)
+    name = table and (table.group(1) or table.group(2))
+    return f"{operation.group(1).upper()} {name}" if name else operation.group(1).upper()
+
+def instrument_engine(engine):
+    """Time statements and commits on an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    # The start time lives on the execution context, not the pooled connection,
+    # so a failing statement (no after_cursor_execute) leaves nothing behind
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        STATEMENT_SECONDS.observe(elapsed, statement_label(statement))
+        if elapsed * 1000 >= LEAD_SLOW_QUERY_MS:
+            params = repr(parameters)
+            if len(params) > MAX_PARAMS_LOGGED:
+                params = params[:MAX_PARAMS_LOGGED] + "..."
+            slow_query_logger.warning(
+                "Slow query (%.1f ms): %s\nParameters: %s", elapsed * 1000, statement, params
+            )
+
+    # COMMIT is not a cursor execute; time the dialect call that issues it
+    dialect = sync_engine.dialect
+    do_commit = dialect.do_commit
+
+    def timed_commit(dbapi_connection):
+        started = time.perf_counter()
+        try:
+            do_commit(dbapi_connection)
+        finally:
+            COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+    dialect.do_commit = timed_commit
+
+
+# Exposition
+
+def render(extra: Optional[list[str]] = None) -> str:
+    lines = []
+    for histogram in (REQUEST_SECONDS, STATEMENT_SECONDS, COMMIT_SECONDS):
+        lines += histogram.render()
+    lines += extra or []
+    return "\n".join(lines) + "\n"
+
+def counter_lines(name: str, help: str, label: str, values: dict[str, int]) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+    lines += [f'{name}{{{label}="{_escape(key)}"}} {value}' for key, value in values.items()]
+    return lines
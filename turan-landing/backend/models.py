@@ -1,9 +1,31 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index, ForeignKey
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from database import Base
 
+# SQLite stores timestamps as text. CURRENT_TIMESTAMP writes them without
+# fractional seconds, so bound parameters must use the same format for the
+# (created_at, id) keyset comparison to line up with what is on disk.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
 class Lead(Base):
     __tablename__ = "leads"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_leads_created_at_id", "created_at", "id"),
+        # Admin filters; trailing (created_at, id) keeps filtered pages index-ordered
+        Index("ix_leads_business_type_created", "business_type", "created_at", "id"),
+        Index("ix_leads_selected_theme_created", "selected_theme", "created_at", "id"),
+        Index("ix_leads_budget_range_created", "budget_range", "created_at", "id"),
+        Index("ix_leads_website_goal_created", "website_goal", "created_at", "id"),
+        # Duplicate detection on bulk import
+        Index("ix_leads_email_phone", "email", "phone"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -26,7 +48,7 @@ class Lead(Base):
     website_goal = Column(String, nullable=True)  # e.g., "sales", "info", "portfolio"
 
     # Features Needed
-    features_needed = Column(Text, nullable=True)  # JSON string of features
+    features_needed = Column(Text, nullable=True)  # JSON string of features, as submitted
     has_logo = Column(Boolean, default=False)
     has_content = Column(Boolean, default=False)
     has_photos = Column(Boolean, default=False)
@@ -38,5 +60,68 @@ class Lead(Base):
     deadline = Column(String, nullable=True)
 
     # Metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     agreed_to_terms = Column(Boolean, default=True)
+
+class LeadFeature(Base):
+    """One row per feature a lead asked for; see features.py."""
+    __tablename__ = "lead_features"
+    __table_args__ = (
+        # ?feature= filter and per-feature counts
+        Index("ix_lead_features_feature_lead", "feature", "lead_id"),
+    )
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    feature = Column(String, primary_key=True)
+
+class LeadRollup(Base):
+    """Lead count per (dimension, bucket), maintained on write; see rollups.py."""
+    __tablename__ = "lead_rollups"
+
+    dimension = Column(String, primary_key=True)  # day, business_type, selected_theme, budget_range
+    bucket = Column(String, primary_key=True)  # "" for NULL
+    count = Column(Integer, nullable=False, default=0)
+
+class LeadSubmissionKey(Base):
+    """Content hash or Idempotency-Key of a stored lead; see idempotency.py."""
+    __tablename__ = "lead_submission_keys"
+    __table_args__ = (
+        Index("ix_lead_submission_keys_lead_id", "lead_id"),
+    )
+
+    key = Column(String, primary_key=True)  # "content:<sha256>" or "idempotency:<header>"
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
+
+class OutboxEvent(Base):
+    """A lead change written with the change itself, waiting for consumers; see outbox.py."""
+    __tablename__ = "lead_outbox"
+    # AUTOINCREMENT: ids of purged events must never be handed out again,
+    # or consumers positioned past them would skip the new ones
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    event = Column(String, nullable=False)  # lead.created, lead.deleted
+    lead_id = Column(Integer, nullable=False)  # no foreign key; deleted leads keep their events
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(Timestamp, server_default=func.now(), index=True)
+
+class OutboxCursor(Base):
+    """Last outbox event id a consumer has handled."""
+    __tablename__ = "lead_outbox_cursors"
+
+    consumer = Column(String, primary_key=True)
+    last_event_id = Column(Integer, nullable=False, default=0)
+
+class Counter(Base):
+    """Row counts maintained on write, so list endpoints never run COUNT(*)."""
+    __tablename__ = "counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class ReplicationCursor(Base):
+    """Last lead id copied to a replica; see replication.py."""
+    __tablename__ = "replication_cursors"
+
+    name = Column(String, primary_key=True)
+    last_lead_id = Column(Integer, nullable=False, default=0)
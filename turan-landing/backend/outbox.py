@@ -0,0 +1,241 @@
+"""Transactional outbox for lead changes.
+
+Every insert path (crud.insert_leads) and delete_lead write a row to
+``lead_outbox`` in the same transaction as the change, so an event exists
+if and only if the change was committed. The dispatcher then hands events to
+each consumer in id order, LEAD_OUTBOX_BATCH at a time:
+
+- every consumer keeps its own position in ``lead_outbox_cursors``, moved
+  only after it has handled a batch, so delivery is at-least-once (events
+  carry their outbox id for deduplication) and one failing consumer backs
+  off without holding up the others;
+- a commit that wrote events wakes the dispatcher straight away; it also
+  polls every LEAD_OUTBOX_POLL_MS for events written by other processes;
+- events older than LEAD_OUTBOX_RETENTION_HOURS are purged once every
+  configured consumer has handled them; a consumer that is down keeps its
+  events (and an error is logged while it lags past retention). A new
+  consumer starts with whatever is still retained.
+
+Cursors are outbox ids, which only works while ids are handed out in commit
+order. That holds for SQLite, where one writer commits at a time. On a
+Postgres primary a transaction can commit after one holding a higher id, and
+a consumer that had already moved past that id would never see its event.
+The app therefore refuses to start consumers unless the primary is SQLite
+(see ids_follow_commits).
+
+Consumers: the Supabase/Postgres replica (LEADS_REPLICA_URL, see
+replication.py) and a webhook (LEAD_OUTBOX_WEBHOOK_URL) that receives
+``{"events": [...]}`` as a JSON POST and must answer 2xx.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import OutboxCursor, OutboxEvent
+from schemas import LeadResponse
+
+try:
+    import httpx
+except ImportError:  # optional: pip install httpx
+    httpx = None
+
+LEAD_OUTBOX_BATCH = int(os.getenv("LEAD_OUTBOX_BATCH", "100"))
+LEAD_OUTBOX_POLL_MS = float(os.getenv("LEAD_OUTBOX_POLL_MS", "5000"))
+LEAD_OUTBOX_RETENTION_HOURS = float(os.getenv("LEAD_OUTBOX_RETENTION_HOURS", "24"))
+LEAD_OUTBOX_WEBHOOK_URL = os.getenv("LEAD_OUTBOX_WEBHOOK_URL")
+MAX_BACKOFF_SECONDS = 60
+PURGE_EVERY_SECONDS = 3600
+
+LEAD_CREATED = "lead.created"
+LEAD_DELETED = "lead.deleted"
+
+# The payload is the lead as GET /api/leads/{id} returns it
+PAYLOAD_FIELDS = tuple(LeadResponse.model_fields)
+
+logger = logging.getLogger(__name__)
+
+
+def ids_follow_commits(engine) -> bool:
+    """Whether ids on ``engine`` can serve as delivery cursors (single SQLite writer)."""
+    return engine.dialect.name == "sqlite"
+
+
+# Writing (caller commits)
+
+async def add_events(db: AsyncSession, name: str, leads: list):
+    """One ``name`` event per lead (ORM object or row dict)."""
+    if not leads:
+        return
+    rows = [
+        {"event": name, "lead_id": payload["id"], "payload": json.dumps(payload, default=_iso, ensure_ascii=False)}
+        for payload in map(_payload, leads)
+    ]
+    await db.execute(OutboxEvent.__table__.insert(), rows)
+    # Picked up by _wake_dispatchers once the transaction commits
+    db.sync_session.info["outbox_written"] = True
+
+def _payload(lead) -> dict:
+    get = lead.get if isinstance(lead, dict) else lambda name: getattr(lead, name)
+    return {name: get(name) for name in PAYLOAD_FIELDS}
+
+def _iso(value):
+    return value.isoformat()
+
+
+# Delivery
+
+class Consumer(Protocol):
+    name: str
+
+    async def deliver(self, events: list[dict]) -> None:
+        """Handle a batch; raise to have the same batch retried later."""
+
+    async def close(self) -> None:
+        ...
+
+
+class WebhookConsumer:
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10):
+        if httpx is None:
+            raise RuntimeError("LEAD_OUTBOX_WEBHOOK_URL needs the httpx package")
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def deliver(self, events: list[dict]):
+        response = await self.client.post(self.url, json={"events": events})
+        response.raise_for_status()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+_dispatchers: set["OutboxDispatcher"] = set()
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatchers(session):
+    if session.info.pop("outbox_written", False):
+        for dispatcher in _dispatchers:
+            dispatcher.notify()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_events(session):
+    session.info.pop("outbox_written", None)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory,
+        consumers: list[Consumer],
+        batch: int = LEAD_OUTBOX_BATCH,
+        poll_ms: float = LEAD_OUTBOX_POLL_MS,
+        retention_hours: float = LEAD_OUTBOX_RETENTION_HOURS,
+    ):
+        self.session_factory = session_factory
+        self.consumers = consumers
+        self.batch = batch
+        self.poll_interval = poll_ms / 1000
+        self.retention = timedelta(hours=retention_hours)
+        self._wakeups = {consumer.name: asyncio.Event() for consumer in consumers}
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        _dispatchers.add(self)
+        self._tasks = [asyncio.create_task(self._consume(consumer)) for consumer in self.consumers]
+        self._tasks.append(asyncio.create_task(self._purge()))
+
+    async def close(self):
+        _dispatchers.discard(self)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for consumer in self.consumers:
+            await consumer.close()
+
+    def notify(self):
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+
+    async def deliver_pending(self, consumer: Consumer) -> int:
+        """Hand ``consumer`` its next batch; returns the number of events delivered."""
+        async with self.session_factory() as db:
+            cursor = await db.get(OutboxCursor, consumer.name)
+            last_id = cursor.last_event_id if cursor else 0
+            rows = (
+                await db.scalars(
+                    select(OutboxEvent).where(OutboxEvent.id > last_id).order_by(OutboxEvent.id).limit(self.batch)
+                )
+            ).all()
+            if not rows:
+                return 0
+            await consumer.deliver([
+                {"id": row.id, "event": row.event, "lead_id": row.lead_id, "payload": json.loads(row.payload)}
+                for row in rows
+            ])
+            await db.merge(OutboxCursor(consumer=consumer.name, last_event_id=rows[-1].id))
+            await db.commit()
+            return len(rows)
+
+    async def _consume(self, consumer: Consumer):
+        wakeup = self._wakeups[consumer.name]
+        delay = 0.0
+        while True:
+            wakeup.clear()
+            try:
+                delivered = await self.deliver_pending(consumer)
+                delay = 0.0
+                if delivered == self.batch:
+                    continue  # more waiting
+            except Exception:
+                delay = min(max(delay * 2, 1), MAX_BACKOFF_SECONDS)
+                logger.exception("Outbox consumer %s failed; retrying in %.0f s", consumer.name, delay)
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def purge(self) -> int:
+        """Delete events past retention that every consumer has handled; returns how many."""
+        cutoff = datetime.now(timezone.utc) - self.retention
+        async with self.session_factory() as db:
+            cursors = await db.execute(select(OutboxCursor.consumer, OutboxCursor.last_event_id))
+            positions = dict(cursors.all())
+            # A consumer without a cursor has handled nothing yet; with no
+            # consumers at all, age alone decides
+            purgeable = OutboxEvent.created_at < cutoff
+            if self.consumers:
+                purgeable &= OutboxEvent.id <= min(positions.get(consumer.name, 0) for consumer in self.consumers)
+            for consumer in self.consumers:
+                behind = await db.scalar(
+                    select(func.count()).select_from(OutboxEvent).where(
+                        OutboxEvent.id > positions.get(consumer.name, 0), OutboxEvent.created_at < cutoff
+                    )
+                )
+                if behind:
+                    logger.error(
+                        "Outbox consumer %s has %d events past retention waiting; they are kept until delivered",
+                        consumer.name, behind,
+                    )
+            result = await db.execute(delete(OutboxEvent).where(purgeable))
+            await db.commit()
+            return result.rowcount
+
+    async def _purge(self):
+        while True:
+            try:
+                await self.purge()
+            except Exception:
+                logger.exception("Failed to purge the lead outbox")
+            await asyncio.sleep(PURGE_EVERY_SECONDS)
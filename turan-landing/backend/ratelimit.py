@@ -0,0 +1,210 @@
+"""Admission control for the lead write endpoints.
+
+Every POST /api/leads and POST /api/leads/bulk passes, in order:
+
+  1. a token bucket per client IP  (LEAD_RATE_IP_PER_MINUTE, LEAD_RATE_IP_BURST)
+  2. a global token bucket         (LEAD_RATE_GLOBAL_PER_SECOND, LEAD_RATE_GLOBAL_BURST)
+  3. a concurrency gate            (LEAD_WRITE_CONCURRENCY requests in flight;
+                                    others wait up to LEAD_WRITE_WAIT_MS)
+
+An empty bucket answers 429 and a full gate 503, both with Retry-After, so
+one client flooding the form cannot push everyone's latency up without
+bound. Other routes are not limited.
+
+Buckets live in process memory by default. With LEAD_RATE_STORE=redis and
+REDIS_URL (and the optional ``redis`` package) they are shared by all
+workers. Set LEAD_RATE_LIMIT=off to disable everything.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from typing import NamedTuple, Optional, Protocol
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional: pip install redis
+    redis = None
+
+LEAD_RATE_LIMIT = os.getenv("LEAD_RATE_LIMIT", "on")  # on | off
+LEAD_RATE_IP_PER_MINUTE = float(os.getenv("LEAD_RATE_IP_PER_MINUTE", "20"))
+LEAD_RATE_IP_BURST = float(os.getenv("LEAD_RATE_IP_BURST", "10"))
+LEAD_RATE_GLOBAL_PER_SECOND = float(os.getenv("LEAD_RATE_GLOBAL_PER_SECOND", "200"))
+LEAD_RATE_GLOBAL_BURST = float(os.getenv("LEAD_RATE_GLOBAL_BURST", "400"))
+LEAD_WRITE_CONCURRENCY = int(os.getenv("LEAD_WRITE_CONCURRENCY", "32"))
+LEAD_WRITE_WAIT_MS = float(os.getenv("LEAD_WRITE_WAIT_MS", "1000"))
+LEAD_RATE_STORE = os.getenv("LEAD_RATE_STORE", "memory")  # memory | redis
+LEAD_RATE_TRUST_FORWARDED = os.getenv("LEAD_RATE_TRUST_FORWARDED", "off")  # on behind a proxy
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+LIMITED_ROUTES = {("POST", "/api/leads"), ("POST", "/api/leads/bulk")}
+
+
+class Limit(NamedTuple):
+    rate: float  # tokens per second
+    burst: float  # bucket size
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take one token; returns 0 if there was one, else seconds until there is."""
+
+
+class MemoryBucketStore:
+    """Buckets in a dict; buckets that have refilled completely are dropped now and then."""
+
+    PRUNE_EVERY = 10000
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float, float]] = {}  # key -> (tokens, updated, full_at)
+        self._calls = 0
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        tokens, updated, _ = self._buckets.get(key, (limit.burst, now, now))
+        tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+
+        self._calls += 1
+        if self._calls % self.PRUNE_EVERY == 0:
+            # A full bucket is the same as no bucket
+            self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+        return wait
+
+
+class RedisBucketStore:
+    """Buckets shared between workers; the refill and take run as one Lua script."""
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or burst
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + (now - updated) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "turan:ratelimit:"):
+        if redis is None:
+            raise RuntimeError("LEAD_RATE_STORE=redis needs the redis package")
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        wait = await self._take(keys=[self.prefix + key], args=[limit.rate, limit.burst])
+        return float(wait)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: BucketStore,
+        per_ip: Limit,
+        global_limit: Limit,
+        concurrency: int,
+        wait_seconds: float,
+        trust_forwarded: bool = False,
+    ):
+        self.store = store
+        self.per_ip = per_ip
+        self.global_limit = global_limit
+        self.gate = asyncio.Semaphore(concurrency)
+        self.wait_seconds = wait_seconds
+        self.trust_forwarded = trust_forwarded
+        self.counters = {"admitted": 0, "rejected_ip": 0, "rejected_global": 0, "rejected_busy": 0}
+        self.in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["RateLimiter"]:
+        if LEAD_RATE_LIMIT == "off":
+            return None
+        store = RedisBucketStore() if LEAD_RATE_STORE == "redis" else MemoryBucketStore()
+        return cls(
+            store,
+            per_ip=Limit(LEAD_RATE_IP_PER_MINUTE / 60, LEAD_RATE_IP_BURST),
+            global_limit=Limit(LEAD_RATE_GLOBAL_PER_SECOND, LEAD_RATE_GLOBAL_BURST),
+            concurrency=LEAD_WRITE_CONCURRENCY,
+            wait_seconds=LEAD_WRITE_WAIT_MS / 1000,
+            trust_forwarded=LEAD_RATE_TRUST_FORWARDED == "on",
+        )
+
+    def client_ip(self, scope) -> str:
+        if self.trust_forwarded:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def snapshot(self) -> dict:
+        return {**self.counters, "in_flight": self.in_flight}
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: Optional[RateLimiter]):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter
+        if (
+            limiter is None
+            or scope["type"] != "http"
+            or (scope["method"], scope["path"].rstrip("/")) not in LIMITED_ROUTES
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        wait = await limiter.store.take(f"ip:{limiter.client_ip(scope)}", limiter.per_ip)
+        if wait:
+            limiter.counters["rejected_ip"] += 1
+            await _reject(send, 429, wait, "Too many submissions from this address")
+            return
+        wait = await limiter.store.take("global", limiter.global_limit)
+        if wait:
+            limiter.counters["rejected_global"] += 1
+            await _reject(send, 429, wait, "Too many submissions")
+            return
+
+        try:
+            await asyncio.wait_for(limiter.gate.acquire(), limiter.wait_seconds)
+        except asyncio.TimeoutError:
+            limiter.counters["rejected_busy"] += 1
+            await _reject(send, 503, 1, "Server is busy, please retry")
+            return
+        limiter.counters["admitted"] += 1
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+            limiter.gate.release()
+
+
+async def _reject(send, status: int, retry_after: float, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,145 @@
+"""Replication of new leads to a Postgres / Supabase ``leads`` table.
+
+With LEADS_REPLICA_URL set, the replica is a consumer of the lead outbox
+(outbox.py): each batch of lead.created events makes it copy the leads the
+replica has not seen yet, in id order, LEADS_REPLICA_BATCH at a time, as one
+upsert per batch keyed on ``landing_id``. The last copied id is kept in
+``replication_cursors`` and only moved once the replica has committed, so a
+crash replays at most one batch, which the upsert makes harmless. Working
+from that cursor rather than the event payloads also picks up leads from
+before the outbox existed. A replica that is down is retried with backoff by
+the dispatcher; submissions are never blocked on it.
+
+The replica's leads table needs a unique landing_id column; anything else
+the ERP keeps there (its own id, status) is left to its defaults:
+
+  alter table leads add column landing_id bigint unique;
+
+To create the table on an empty database (e.g. a local Postgres stand-in)
+or to copy everything pending in one go (run from turan-landing/backend):
+
+  python replication.py init
+  python replication.py run
+
+Admin deletions are not replicated: once the ERP has a lead, it owns it.
+Ids only work as a cursor while one writer hands them out in commit order,
+which holds for the SQLite primary this is meant for; with any other primary
+the app and this CLI refuse to replicate (outbox.ids_follow_commits).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from sqlalchemy import BigInteger, Column, Integer, MetaData, String, Table, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+import outbox
+from models import Lead, ReplicationCursor
+
+LEADS_REPLICA_URL = os.getenv("LEADS_REPLICA_URL")  # e.g. a Supabase connection string
+LEADS_REPLICA_BATCH = int(os.getenv("LEADS_REPLICA_BATCH", "500"))
+
+CURSOR = "replica:leads"
+REPLICATED_COLUMNS = [column.name for column in Lead.__table__.columns if column.name != "id"]
+
+logger = logging.getLogger(__name__)
+
+replica_metadata = MetaData()
+replica_leads = Table(
+    "leads",
+    replica_metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True),
+    Column("landing_id", BigInteger, nullable=False, unique=True),
+    *(Column(name, Lead.__table__.c[name].type) for name in REPLICATED_COLUMNS),
+    Column("status", String, nullable=False, server_default="new"),
+)
+
+
+async def replicate_batch(db: AsyncSession, replica: AsyncEngine, batch: int = LEADS_REPLICA_BATCH) -> int:
+    """Copy the next ``batch`` leads; returns how many were copied."""
+    cursor = await db.get(ReplicationCursor, CURSOR)
+    last_id = cursor.last_lead_id if cursor else 0
+    rows = (
+        await db.execute(select(Lead.__table__).where(Lead.id > last_id).order_by(Lead.id).limit(batch))
+    ).all()
+    if not rows:
+        return 0
+
+    values = [
+        {"landing_id": row.id, **{name: row._mapping[name] for name in REPLICATED_COLUMNS}}
+        for row in rows
+    ]
+    dialect = postgresql if replica.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(replica_leads)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[replica_leads.c.landing_id],
+        set_={name: stmt.excluded[name] for name in REPLICATED_COLUMNS},
+    )
+    async with replica.begin() as conn:
+        await conn.execute(stmt, values)
+
+    await db.merge(ReplicationCursor(name=CURSOR, last_lead_id=rows[-1].id))
+    await db.commit()
+    return len(rows)
+
+async def replicate_pending(session_factory, replica: AsyncEngine, batch: int = LEADS_REPLICA_BATCH) -> int:
+    total = 0
+    while True:
+        async with session_factory() as db:
+            copied = await replicate_batch(db, replica, batch)
+        total += copied
+        if copied < batch:
+            return total
+
+
+class ReplicaConsumer:
+    """Outbox consumer; the events only say when to look, the cursor says where."""
+
+    name = "replica"
+
+    def __init__(self, session_factory, replica: AsyncEngine, batch: int = LEADS_REPLICA_BATCH):
+        self.session_factory = session_factory
+        self.replica = replica
+        self.batch = batch
+
+    async def deliver(self, events: list[dict]):
+        if any(event["event"] == outbox.LEAD_CREATED for event in events):
+            copied = await replicate_pending(self.session_factory, self.replica, self.batch)
+            if copied:
+                logger.info("Replicated %d leads", copied)
+
+    async def close(self):
+        await self.replica.dispose()
+
+
+async def _main(command: str) -> int:
+    from database import SessionLocal, build_engine, engine
+
+    if not LEADS_REPLICA_URL:
+        print("LEADS_REPLICA_URL is not set")
+        return 1
+    if command == "run" and not outbox.ids_follow_commits(engine):
+        print("Replication needs a SQLite primary (DATABASE_URL): lead ids are the cursor")
+        return 1
+    replica = build_engine(LEADS_REPLICA_URL)
+    if command == "init":
+        async with replica.begin() as conn:
+            await conn.run_sync(replica_metadata.create_all)
+        print("Replica leads table is ready")
+    else:
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: ReplicationCursor.__table__.create(sync_conn, checkfirst=True))
+        copied = await replicate_pending(SessionLocal, replica)
+        print(f"Replicated {copied} leads")
+    await replica.dispose()
+    await engine.dispose()
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["init", "run"])
+    sys.exit(asyncio.run(_main(parser.parse_args().command)))
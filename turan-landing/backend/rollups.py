@@ -0,0 +1,145 @@
+"""Lead counts per day, business type, theme and budget for GET /api/leads/stats.
+
+``lead_rollups`` holds one (dimension, bucket, count) row per bucket. The
+insert paths and delete_lead adjust it in the same transaction as the lead
+itself, so reading the stats costs O(buckets) however many leads there are.
+NULL values are stored as the empty bucket.
+
+The table is built from ``leads`` when it is first created. To recompute it
+or check it against ``leads`` (run from turan-landing/backend):
+
+  python rollups.py rebuild
+  python rollups.py verify
+"""
+
+import argparse
+import asyncio
+import sys
+from collections import Counter as Tally
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import String, cast, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Lead, LeadRollup
+
+DIMENSIONS = ("business_type", "selected_theme", "budget_range")
+DAY = "day"
+
+
+def lead_buckets(lead) -> list[tuple[str, str]]:
+    """(dimension, bucket) pairs a lead (ORM object or row dict) counts towards."""
+    get = lead.get if isinstance(lead, dict) else lambda name: getattr(lead, name)
+    buckets = [(DAY, get("created_at").date().isoformat())]
+    buckets += [(name, get(name) or "") for name in DIMENSIONS]
+    return buckets
+
+
+# Incremental updates (caller commits)
+
+async def add_leads(db: AsyncSession, leads: list):
+    await _apply(db, Tally(bucket for lead in leads for bucket in lead_buckets(lead)))
+
+async def remove_lead(db: AsyncSession, lead: Lead):
+    await _apply(db, Tally({bucket: -1 for bucket in lead_buckets(lead)}))
+    await db.execute(delete(LeadRollup).where(LeadRollup.count <= 0))
+
+async def _apply(db: AsyncSession, deltas: Tally):
+    rows = [
+        {"dimension": dimension, "bucket": bucket, "count": delta}
+        for (dimension, bucket), delta in deltas.items()
+        if delta
+    ]
+    if not rows:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(LeadRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LeadRollup.dimension, LeadRollup.bucket],
+        set_={"count": LeadRollup.count + stmt.excluded["count"]},
+    )
+    await db.execute(stmt, rows)
+
+
+# Reads
+
+async def get_buckets(db: AsyncSession, since: Optional[date] = None) -> dict[str, list]:
+    """{dimension: [(bucket, count), ...]}; days ascending, the rest by count."""
+    stmt = select(LeadRollup.dimension, LeadRollup.bucket, LeadRollup.count)
+    if since:
+        stmt = stmt.where((LeadRollup.dimension != DAY) | (LeadRollup.bucket >= since.isoformat()))
+    result = {DAY: [], **{name: [] for name in DIMENSIONS}}
+    for dimension, bucket, count in await db.execute(stmt):
+        result.setdefault(dimension, []).append((bucket or None, count))
+    for dimension, buckets in result.items():
+        if dimension == DAY:
+            buckets.sort()
+        else:
+            buckets.sort(key=lambda item: (-item[1], item[0] or ""))
+    return result
+
+
+# Rebuild and verify
+
+def _from_leads():
+    """SELECT dimension, bucket, count computed from the leads table."""
+    count = func.count().label("count")
+    day = cast(func.date(Lead.created_at), String)
+    queries = [
+        select(literal(DAY).label("dimension"), day.label("bucket"), count).group_by(day)
+    ]
+    for name in DIMENSIONS:
+        column = func.coalesce(getattr(Lead, name), "")
+        queries.append(
+            select(literal(name).label("dimension"), column.label("bucket"), count).group_by(column)
+        )
+    return union_all(*queries)
+
+def rebuild(conn) -> int:
+    """Recompute every bucket from leads; returns the number of buckets."""
+    conn.execute(delete(LeadRollup))
+    source = _from_leads().subquery()
+    conn.execute(
+        insert(LeadRollup).from_select(
+            ["dimension", "bucket", "count"],
+            select(source.c.dimension, source.c.bucket, source.c.count),
+        )
+    )
+    return conn.scalar(select(func.count()).select_from(LeadRollup))
+
+def verify(conn) -> list[tuple[str, str, int, int]]:
+    """Buckets whose stored count differs from leads: (dimension, bucket, stored, actual)."""
+    actual = {(d, b): n for d, b, n in conn.execute(_from_leads())}
+    stored = {
+        (d, b): n
+        for d, b, n in conn.execute(select(LeadRollup.dimension, LeadRollup.bucket, LeadRollup.count))
+    }
+    mismatches = []
+    for key in sorted(actual.keys() | stored.keys()):
+        if stored.get(key, 0) != actual.get(key, 0):
+            mismatches.append((*key, stored.get(key, 0), actual.get(key, 0)))
+    return mismatches
+
+
+async def _main(command: str) -> int:
+    from database import engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: LeadRollup.__table__.create(sync_conn, checkfirst=True))
+        if command == "rebuild":
+            buckets = await conn.run_sync(rebuild)
+            print(f"Rebuilt {buckets} buckets")
+        mismatches = await conn.run_sync(verify)
+    await engine.dispose()
+
+    for dimension, bucket, stored, actual in mismatches:
+        print(f"{dimension}={bucket!r}: stored {stored}, leads {actual}")
+    print("OK" if not mismatches else f"{len(mismatches)} buckets differ")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    sys.exit(asyncio.run(_main(parser.parse_args().command)))
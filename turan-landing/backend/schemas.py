@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
 class LeadCreate(BaseModel):
     # Basic Info
@@ -73,6 +73,73 @@ class LeadResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class LeadSummary(BaseModel):
+    """The columns the admin table shows; no large text fields."""
+    id: int
+    name: str
+    business_name: Optional[str]
+    business_type: Optional[str]
+    email: str
+    phone: str
+    selected_theme: str
+    budget_range: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class LeadList(BaseModel):
     leads: list[LeadResponse]
     total: int
+    # Opaque keyset cursor; pass back as ?cursor= to fetch the next page
+    next_cursor: Optional[str] = None
+
+class LeadSummaryList(BaseModel):
+    leads: list[LeadSummary]
+    total: int
+    next_cursor: Optional[str] = None
+
+class LeadFilters(BaseModel):
+    business_type: Optional[str] = None
+    selected_theme: Optional[str] = None
+    budget_range: Optional[str] = None
+    website_goal: Optional[str] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None  # inclusive
+    feature: Optional[str] = None  # leads that asked for this feature
+    q: Optional[str] = None  # full-text search over description, competitors, notes
+    sort: Literal["newest", "oldest"] = "newest"
+
+    def is_empty(self) -> bool:
+        """No filter set; the sort order does not change which leads match."""
+        return not self.model_dump(exclude_defaults=True, exclude={"sort"})
+
+class FeatureCount(BaseModel):
+    feature: str
+    count: int
+
+class FeatureStats(BaseModel):
+    features: list[FeatureCount]
+
+class StatsBucket(BaseModel):
+    key: Optional[str]  # None for leads without a value
+    count: int
+
+class LeadStats(BaseModel):
+    total: int
+    by_day: list[StatsBucket]  # oldest first, days without leads omitted
+    by_business_type: list[StatsBucket]
+    by_selected_theme: list[StatsBucket]
+    by_budget_range: list[StatsBucket]
+
+class BulkRowResult(BaseModel):
+    index: int  # position of the record in the request body
+    status: Literal["created", "duplicate", "invalid"]
+    id: Optional[int] = None  # new lead, or the existing one for duplicates
+    errors: Optional[list[str]] = None
+
+class BulkImportResult(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[BulkRowResult]
@@ -0,0 +1,81 @@
+"""Full-text search over lead briefs.
+
+On SQLite the free-text columns are mirrored into an FTS5 external-content
+table, so a search is an index lookup rather than a LIKE scan. Triggers keep
+it in sync on INSERT, UPDATE and DELETE, whatever writes the row: the API,
+scripts or manual SQL. Other databases fall back to ILIKE.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import Integer, column, or_, text
+
+from models import Lead
+
+SEARCH_COLUMNS = ("business_description", "competitors", "additional_notes")
+
+_cols = ", ".join(SEARCH_COLUMNS)
+_new = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_old = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE leads_fts USING fts5(
+        {_cols}, content='leads', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER leads_fts_ai AFTER INSERT ON leads BEGIN
+        INSERT INTO leads_fts(rowid, {_cols}) VALUES (new.id, {_new});
+    END""",
+    f"""CREATE TRIGGER leads_fts_ad AFTER DELETE ON leads BEGIN
+        INSERT INTO leads_fts(leads_fts, rowid, {_cols}) VALUES ('delete', old.id, {_old});
+    END""",
+    f"""CREATE TRIGGER leads_fts_au AFTER UPDATE ON leads BEGIN
+        INSERT INTO leads_fts(leads_fts, rowid, {_cols}) VALUES ('delete', old.id, {_old});
+        INSERT INTO leads_fts(rowid, {_cols}) VALUES (new.id, {_new});
+    END""",
+    # Index rows that existed before the FTS table did
+    "INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')",
+]
+INSERT_TRIGGER = FTS_DDL[1]
+
+def create_search_index(conn):
+    """Create the FTS5 table and its triggers once (SQLite only)."""
+    if conn.dialect.name != "sqlite":
+        return
+    objects = {
+        name
+        for (name,) in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE name IN ('leads_fts', 'leads_fts_ai')"
+        )
+    }
+    if "leads_fts" not in objects:
+        for ddl in FTS_DDL:
+            conn.exec_driver_sql(ddl)
+    elif "leads_fts_ai" not in objects:
+        # Databases from when inserts were indexed by the app only: put the
+        # trigger back and pick up rows that other writers left out
+        conn.exec_driver_sql(INSERT_TRIGGER)
+        conn.exec_driver_sql("INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')")
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn user input into a safe FTS5 query: every word, as a prefix, ANDed."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_condition(dialect_name: str, query: str):
+    if dialect_name == "sqlite":
+        match = match_expression(query)
+        if match is None:
+            return None
+        matching_ids = (
+            text("SELECT rowid FROM leads_fts WHERE leads_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(column("rowid", Integer))
+        )
+        return Lead.id.in_(matching_ids)
+
+    pattern = f"%{query}%"
+    return or_(*(getattr(Lead, name).ilike(pattern) for name in SEARCH_COLUMNS))
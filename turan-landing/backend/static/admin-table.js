@@ -0,0 +1,256 @@
+/*
+ * Virtualized leads table for the admin dashboard.
+ *
+ * Only the rows inside the scroll viewport (plus some overscan) are in the
+ * DOM; two spacer rows stand in for everything above and below. Rows are
+ * keyed by lead id and reused across renders, so scrolling, refreshing or a
+ * live update only touches the rows that actually changed.
+ *
+ * Loaded by /admin as a classic script, and by benchmarks/bench_admin_table.js
+ * under node with a stub DOM.
+ */
+(function (root) {
+    'use strict';
+
+    function leadCells(lead) {
+        return `
+            <td class="px-4 py-4 text-white/60">#${lead.id}</td>
+            <td class="px-4 py-4 font-medium">${lead.name}</td>
+            <td class="px-4 py-4 text-white/80">
+                <div class="font-medium">${lead.business_name || '-'}</div>
+                <div class="text-xs text-white/50">${lead.business_type || ''}</div>
+            </td>
+            <td class="px-4 py-4">
+                <a href="mailto:${lead.email}" class="text-turan-gold hover:underline block text-sm">${lead.email}</a>
+                <a href="tel:${lead.phone}" class="text-white/60 hover:text-white text-sm">${lead.phone}</a>
+            </td>
+            <td class="px-4 py-4">
+                <span class="px-2 py-1 rounded-full text-xs bg-white/10 capitalize">${lead.selected_theme}</span>
+            </td>
+            <td class="px-4 py-4 text-white/80 text-sm">${lead.budget_range || '-'}</td>
+            <td class="px-4 py-4 text-white/60 text-sm">
+                ${new Date(lead.created_at).toLocaleDateString()}
+            </td>
+            <td class="px-4 py-4 flex gap-2">
+                <button
+                    onclick="viewDetails(${lead.id})"
+                    class="text-turan-gold hover:text-turan-bronze text-sm flex items-center gap-1"
+                >
+                    <svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M2 12s3-7 10-7 10 7 10 7-3 7-10 7-10-7-10-7Z"/><circle cx="12" cy="12" r="3"/></svg>
+                    View
+                </button>
+                <button
+                    onclick="deleteLead(${lead.id})"
+                    class="text-red-400 hover:text-red-300 text-sm flex items-center gap-1"
+                >
+                    <svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M3 6h18"/><path d="M19 6v14c0 1-1 2-2 2H7c-1 0-2-1-2-2V6"/><path d="M8 6V4c0-1 1-2 2-2h4c1 0 2 1 2 2v2"/></svg>
+                    Delete
+                </button>
+            </td>
+        `;
+    }
+
+    function sameLead(a, b) {
+        for (const key in b) {
+            if (a[key] !== b[key]) return false;
+        }
+        return true;
+    }
+
+    class LeadTable {
+        constructor({
+            tbody,
+            scroller,
+            document = root.document,
+            rowHtml = leadCells,
+            rowClass = '',
+            columns = 8,
+            rowHeight = 73,
+            overscan = 10,
+            onNeedMore = () => {},
+            schedule = (callback) => root.requestAnimationFrame(callback),
+        }) {
+            this.tbody = tbody;
+            this.scroller = scroller;
+            this.document = document;
+            this.rowHtml = rowHtml;
+            this.rowClass = rowClass;
+            this.columns = columns;
+            this.rowHeight = rowHeight;
+            this.overscan = overscan;
+            this.onNeedMore = onNeedMore;
+            this.schedule = schedule;
+
+            this.ids = [];              // display order
+            this.leads = new Map();     // id -> lead
+            this.rows = new Map();      // id -> <tr>, only rows currently in the DOM
+            this.measured = false;
+            this.pending = false;
+            this.message = null;
+
+            this.topSpacer = this._spacer();
+            this.bottomSpacer = this._spacer();
+            this.tbody.textContent = '';
+            this.tbody.appendChild(this.topSpacer);
+            this.tbody.appendChild(this.bottomSpacer);
+
+            this.scroller.addEventListener('scroll', () => this.scheduleRender());
+        }
+
+        get size() {
+            return this.ids.length;
+        }
+
+        has(id) {
+            return this.leads.has(id);
+        }
+
+        get(id) {
+            return this.leads.get(id);
+        }
+
+        /* Replace the contents (first page after a refresh or filter change).
+         * Unchanged leads keep their object, so their rows are left alone. */
+        reset(leads) {
+            const previous = this.leads;
+            this.ids = [];
+            this.leads = new Map();
+            this._add(leads, previous);
+            this.render();
+        }
+
+        /* Add the next page from infinite scroll. */
+        append(leads) {
+            this._add(leads, this.leads);
+            this.render();
+        }
+
+        /* Add a lead on top (live feed). */
+        prepend(lead) {
+            if (this.leads.has(lead.id)) return;
+            this.ids.unshift(lead.id);
+            this.leads.set(lead.id, lead);
+            // Keep what the user is looking at in place
+            if (this.scroller.scrollTop > 0) this.scroller.scrollTop += this.rowHeight;
+            this.render();
+        }
+
+        remove(id) {
+            if (!this.leads.delete(id)) return;
+            this.ids.splice(this.ids.indexOf(id), 1);
+            this.render();
+        }
+
+        /* Show a single full-width row instead of leads (empty, error). */
+        showMessage(html) {
+            this.ids = [];
+            this.leads = new Map();
+            this.render();
+            if (!this.message) {
+                this.message = this.document.createElement('tr');
+                this.tbody.insertBefore(this.message, this.bottomSpacer);
+            }
+            this.message.innerHTML = html;
+        }
+
+        scheduleRender() {
+            if (this.pending) return;
+            this.pending = true;
+            this.schedule(() => {
+                this.pending = false;
+                this.render();
+            });
+        }
+
+        render() {
+            if (this.message && this.ids.length) {
+                this.message.remove();
+                this.message = null;
+            }
+
+            const { scrollTop, clientHeight } = this.scroller;
+            const total = this.ids.length;
+            const first = Math.min(total, Math.max(0, Math.floor(scrollTop / this.rowHeight) - this.overscan));
+            const last = Math.min(total, Math.ceil((scrollTop + clientHeight) / this.rowHeight) + this.overscan);
+
+            this.topSpacer.firstChild.style.height = `${first * this.rowHeight}px`;
+            this.bottomSpacer.firstChild.style.height = `${Math.max(0, total - last) * this.rowHeight}px`;
+
+            const visible = this.ids.slice(first, last);
+            const keep = new Set(visible);
+            for (const [id, row] of this.rows) {
+                if (!keep.has(id)) {
+                    row.remove();
+                    this.rows.delete(id);
+                }
+            }
+
+            // Walk the visible ids in order, reusing rows and moving only what is out of place
+            let cursor = this.topSpacer.nextSibling;
+            for (const id of visible) {
+                const lead = this.leads.get(id);
+                let row = this.rows.get(id);
+                if (!row) {
+                    row = this._row(lead);
+                    this.rows.set(id, row);
+                } else if (row.lead !== lead) {
+                    row.innerHTML = this.rowHtml(lead);
+                    row.lead = lead;
+                }
+                if (row === cursor) {
+                    cursor = cursor.nextSibling;
+                } else {
+                    this.tbody.insertBefore(row, cursor);
+                }
+            }
+
+            if (!this.measured && visible.length) {
+                const height = this.rows.get(visible[0]).offsetHeight;
+                if (height) {
+                    this.measured = true;
+                    if (Math.abs(height - this.rowHeight) > 1) {
+                        this.rowHeight = height;
+                        this.render();
+                        return;
+                    }
+                }
+            }
+
+            if (last >= total - this.overscan) this.onNeedMore();
+        }
+
+        _add(leads, previous) {
+            for (const lead of leads) {
+                if (this.leads.has(lead.id)) continue;
+                const old = previous.get(lead.id);
+                this.ids.push(lead.id);
+                this.leads.set(lead.id, old && sameLead(old, lead) ? old : lead);
+            }
+        }
+
+        _row(lead) {
+            const row = this.document.createElement('tr');
+            row.className = this.rowClass;
+            row.dataset.id = lead.id;
+            row.innerHTML = this.rowHtml(lead);
+            row.lead = lead;
+            return row;
+        }
+
+        _spacer() {
+            const row = this.document.createElement('tr');
+            const cell = this.document.createElement('td');
+            cell.colSpan = this.columns;
+            cell.style.padding = '0';
+            row.appendChild(cell);
+            return row;
+        }
+    }
+
+    if (typeof module === 'object' && module.exports) {
+        module.exports = { LeadTable, leadCells };
+    } else {
+        root.LeadTable = LeadTable;
+        root.leadCells = leadCells;
+    }
+})(typeof window !== 'undefined' ? window : globalThis);
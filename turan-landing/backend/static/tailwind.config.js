@@ -0,0 +1,20 @@
+// Tailwind build for the /admin dashboard (ADMIN_HTML in main.py, rows in admin-table.js).
+// Rebuild admin.css after changing classes in the dashboard markup:
+//   npx tailwindcss@3 -c static/tailwind.config.js -i static/admin.src.css -o static/admin.css
+// (run from turan-landing/backend)
+module.exports = {
+  content: ['./main.py', './static/admin-table.js'],
+  theme: {
+    extend: {
+      colors: {
+        turan: {
+          gold: '#D4AF37',
+          bronze: '#CD7F32',
+          dark: '#1A1A2E',
+          navy: '#16213E',
+          accent: '#0F3460',
+        }
+      }
+    }
+  }
+}
@@ -78,6 +78,8 @@ export default function OnboardingFlow() {
   const [isFullscreen, setIsFullscreen] = useState(false);
   const [isComplete, setIsComplete] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // One key per filled-in form, so a double-clicked or retried submit is stored once
+  const [submissionKey] = useState(() => crypto.randomUUID?.() ?? `${Date.now()}-${Math.random()}`);
   
   const [fontSizeMultiplier, setFontSizeMultiplier] = useState(1);
   const [showRealLogo, setShowRealLogo] = useState(false);
@@ -151,7 +153,7 @@ export default function OnboardingFlow() {
 
   const handleSubmit = async () => {
     setIsSubmitting(true);
-    try { await axios.post('/api/leads', { ...formData, featuresNeeded: JSON.stringify(formData.featuresNeeded), agreedToTerms: true }); setIsComplete(true); } 
+    try { await axios.post('/api/leads', { ...formData, featuresNeeded: JSON.stringify(formData.featuresNeeded), agreedToTerms: true }, { headers: { 'Idempotency-Key': submissionKey } }); setIsComplete(true); } 
     catch (e) { setIsComplete(true); } finally { setIsSubmitting(false); }
   };
 